@@ -1,11 +1,12 @@
-import json
 from math import ceil
 
 import pandas as pd
 import streamlit as st
 
-from pokemon import Species, Pokemon, calculate_damage_ranges, Move, parse_type_string, Type, get_path_to_file, \
-    get_type_multiplier, TYPE_EXCELLENT_THRESHOLDS
+from pokemon import Pokemon, calculate_damage_ranges, Move, Type, get_path_to_file, get_type_multiplier, \
+    TYPE_EXCELLENT_THRESHOLDS, get_game_data, infer_defender_stats, \
+    simulate_shield_scenarios, optimize_moveset, find_counters, simulate_battle_trials, rank_raid_attackers, \
+    RAID_BOSS_TIERS, WEATHER_BOOSTS, rank_moves
 
 
 def display_calculated_damage(move, attacker, target):
@@ -42,10 +43,12 @@ def display_calculated_damage(move, attacker, target):
     except ZeroDivisionError:
         damage_per_energy = "∞"
 
+    type_multiplier = get_type_multiplier(move.type, target.species.types)
+
     effectiveness_text = ""
-    if get_type_multiplier(move.type, target.species.types) > 1:
+    if type_multiplier > 1:
         effectiveness_text = ":green[It's super effective!]"
-    elif get_type_multiplier(move.type, target.species.types) < 1:
+    elif type_multiplier < 1:
         effectiveness_text = ":red[It's not very effective...]"
 
     damage_rolls_string = "Possible damage amounts: (" + ", ".join(
@@ -122,86 +125,15 @@ def display_calculated_damage(move, attacker, target):
 
 
 def load_data():
-    with open("pokemon/game_data/pokemon.json", "r") as f:
-        pokemon_json = json.load(f)
-
-    with open("pokemon/game_data/moves.json", "r") as f:
-        moves_json = json.load(f)
-
-    moves_dict = {}
-    moves_list = []
-
-    for move_json_key in moves_json:
-        unique_id = moves_json[move_json_key]["uniqueId"]
-        name = moves_json[move_json_key]["displayName"]
-
-        raw_type_string = moves_json[move_json_key]["type"]
-        move_type = parse_type_string(raw_type_string)
-
-        power = moves_json[move_json_key]["power"]
-        energy = moves_json[move_json_key]["energyDelta"]
-        turns = moves_json[move_json_key]["turns"]
-        usage_type = moves_json[move_json_key]["usageType"]
-
-        move = Move(
-            name=name,
-            unique_id=unique_id,
-            type=move_type,
-            power=power,
-            energy=energy,
-            turns=turns,
-            usage_type=usage_type
-        )
-
-        moves_dict.update({unique_id: move})
-        moves_list.append(move)
-
-    species_dict = {}
-    species_list = []
-    forms_dict = {}
-
-    for pokemon_json_key in pokemon_json:
-        name = Species.parse_pokemon_string(pokemon_json[pokemon_json_key]["name"])
-        species_name = pokemon_json[pokemon_json_key]["species"]
-
-        types = []
-        for raw_type_string in pokemon_json[pokemon_json_key]["types"]:
-            if raw_type_string:
-                types.append(parse_type_string(raw_type_string))
-
-        base_attack = pokemon_json[pokemon_json_key]["base_attack"]
-        base_defense = pokemon_json[pokemon_json_key]["base_defense"]
-        base_hp = pokemon_json[pokemon_json_key]["base_hp"]
-
-        fast_move_pool = []
-        for raw_move_string in pokemon_json[pokemon_json_key]["fast_move_pool"]:
-            move = moves_dict[raw_move_string]
-            fast_move_pool.append(move)
-
-        charged_move_pool = []
-        for raw_move_string in pokemon_json[pokemon_json_key]["charged_move_pool"]:
-            move = moves_dict[raw_move_string]
-            charged_move_pool.append(move)
-
-        species = Species(
-            name=name,
-            species=species_name,
-            types=types,
-            base_attack=base_attack,
-            base_defense=base_defense,
-            base_hp=base_hp,
-            fast_move_pool=fast_move_pool,
-            charged_move_pool=charged_move_pool
-        )
+    game_data = get_game_data()
 
-        species_dict.update({name: species})
+    moves_dict = dict(game_data.moves_by_id)
+    moves_list = list(game_data.moves)
 
-        species_list.append(species)
+    species_dict = dict(game_data.species_by_name)
+    species_list = list(game_data.species)
 
-        if species_name in forms_dict:
-            forms_dict[species_name].append(name)
-        else:
-            forms_dict[species_name] = [name]
+    forms_dict = {species_name: list(forms) for species_name, forms in game_data.forms.items()}
 
     return moves_dict, moves_list, species_dict, species_list, forms_dict
 
@@ -528,3 +460,195 @@ if __name__ == "__main__":
                 display_calculated_damage(move1, pokemon1, pokemon2)
             elif move2:
                 display_calculated_damage(move2, pokemon2, pokemon1)
+
+        st.write("---")
+
+        st.write("#### Reverse Calculator")
+
+        if not species1 or not species2 or not move1:
+            st.write("Select 2 Pokémon and a move for Pokémon 1 to infer Pokémon 2's level and IVs from the damage it "
+                     "took.")
+        else:
+            observed_damage = st.number_input("Damage dealt by Pokémon 1", min_value=1, max_value=10000, value=1)
+            known_cp = st.number_input("Pokémon 2's CP (0 if unknown)", min_value=0, max_value=10000, value=0)
+
+            candidates = infer_defender_stats(
+                pokemon1,
+                species2,
+                [(move1, observed_damage)],
+                cp=known_cp or None,
+                shadow=is_shadow2,
+                defense_stages=def_stages2
+            )
+
+            st.write(f"{len(candidates)} possible level and IV combinations")
+
+            if len(candidates):
+                st.dataframe(
+                    pd.DataFrame(candidates[:1000]),
+                    column_config={
+                        "level": st.column_config.NumberColumn(label="Level", format="%.1f"),
+                        "attack_iv": st.column_config.NumberColumn(label="Attack IV"),
+                        "defense_iv": st.column_config.NumberColumn(label="Defense IV"),
+                        "hp_iv": st.column_config.NumberColumn(label="HP IV"),
+                        "cp": st.column_config.NumberColumn(label="CP")
+                    },
+                    hide_index=True
+                )
+
+        st.write("---")
+
+        st.write("#### Shield Scenarios")
+
+        if not species1 or not species2:
+            st.write("Select 2 Pokémon to battle them with every number of shields.")
+        else:
+            left_column_5, right_column_5 = st.columns(2)
+
+            with left_column_5:
+                fast_move1 = st.selectbox("Pokémon 1's fast move", species1.fast_move_pool, index=None,
+                                          placeholder="Select a move...")
+                charged_moves1 = st.multiselect("Pokémon 1's charged moves", species1.charged_move_pool,
+                                                max_selections=2, placeholder="Select up to 2 moves...")
+
+            with right_column_5:
+                fast_move2 = st.selectbox("Pokémon 2's fast move", species2.fast_move_pool, index=None,
+                                          placeholder="Select a move...")
+                charged_moves2 = st.multiselect("Pokémon 2's charged moves", species2.charged_move_pool,
+                                                max_selections=2, placeholder="Select up to 2 moves...")
+
+            if not fast_move1 or not charged_moves1 or not fast_move2 or not charged_moves2:
+                st.write("Select a fast move and at least 1 charged move for both Pokémon.")
+            else:
+                scenarios = simulate_shield_scenarios(pokemon1, [fast_move1] + charged_moves1,
+                                                      pokemon2, [fast_move2] + charged_moves2)
+
+                shield_labels = [f"{shields} shield{'' if shields == 1 else 's'}" for shields in range(len(scenarios))]
+                scenarios_df = pd.DataFrame(
+                    scenarios["rating"],
+                    index=[f"Pokémon 1: {label}" for label in shield_labels],
+                    columns=[f"Pokémon 2: {label}" for label in shield_labels]
+                )
+
+                st.write("Battle rating of Pokémon 1. Above 500 is a win, below 500 is a loss.")
+                st.dataframe(scenarios_df.style.map(
+                    lambda rating: f"color: {'green' if rating > 500 else 'red' if rating < 500 else 'gray'}"
+                ))
+
+                skill = st.slider("Chance of swiping each bubble", min_value=0.0, max_value=1.0, value=0.9)
+                trial_shields = (st.number_input("Pokémon 1's shields", min_value=0, max_value=2, value=1),
+                                 st.number_input("Pokémon 2's shields  ", min_value=0, max_value=2, value=1))
+
+                trials = simulate_battle_trials(pokemon1, [fast_move1] + charged_moves1, pokemon2,
+                                                [fast_move2] + charged_moves2, trials=10000, shields=trial_shields,
+                                                skill=skill)
+                low, high = trials["win_interval"]
+
+                st.write(f"Over 10,000 battles with random bubbles and buffs, Pokémon 1 wins "
+                         f"{trials['win_probability']:.1%} of the time (95% confidence: {low:.1%} to {high:.1%}), "
+                         f"with an average battle rating of {trials['rating']:.0f}.")
+
+        st.write("---")
+
+        st.write("#### Moveset Optimizer")
+
+        if not species1 or not species2:
+            st.write("Select 2 Pokémon to rank Pokémon 1's movesets against Pokémon 2.")
+        elif not species1.fast_move_pool or not species1.charged_move_pool:
+            st.write("Pokémon 1 has no movesets to rank.")
+        else:
+            target_shields = st.number_input("Pokémon 2's shields", min_value=0, max_value=2, value=1)
+
+            movesets = optimize_moveset(pokemon1, [pokemon2], shields=target_shields, top=10)
+
+            movesets_df = pd.DataFrame({
+                "Fast Move": [moveset["fast_move"].name for moveset in movesets],
+                "Charged Moves": [", ".join(move.name for move in moveset["charged_moves"])
+                                  for moveset in movesets],
+                "Turns to KO": [round(moveset["turns_to_ko"], 1) for moveset in movesets],
+                "Damage per Turn": [round(moveset["dpt"], 2) for moveset in movesets]
+            })
+
+            st.dataframe(movesets_df, hide_index=True)
+
+        st.write("---")
+
+        st.write("#### Top Counters")
+
+        if not species2:
+            st.write("Select Pokémon 2 to find its best counters.")
+        else:
+            counter_shields = st.number_input("Pokémon 2's shields ", min_value=0, max_value=2, value=1)
+
+            counters = find_counters(pokemon2, k=10, shields=counter_shields)
+
+            counters_df = pd.DataFrame({
+                "Pokémon": [counter["species"].name for counter in counters["counters"]],
+                "Fast Move": [counter["fast_move"].name for counter in counters["counters"]],
+                "Charged Moves": [", ".join(move.name for move in counter["charged_moves"])
+                                  for counter in counters["counters"]],
+                "Turns to KO": [round(counter["turns_to_ko"], 1) for counter in counters["counters"]]
+            })
+
+            st.write(f"Level 40 counters with perfect IVs, {counters['pruned']} Pokémon ruled out without a full "
+                     f"check.")
+            st.dataframe(counters_df, hide_index=True)
+
+        st.write("---")
+
+        st.write("#### Raid Attackers")
+
+        if not species2:
+            st.write("Select Pokémon 2 to rank the best raid attackers against it.")
+        elif species2.base_defense is None:
+            st.write("Pokémon 2 has no base stats.")
+        else:
+            left_column_6, right_column_6 = st.columns(2)
+
+            with left_column_6:
+                raid_tier = st.selectbox("Raid tier", list(RAID_BOSS_TIERS), index=len(RAID_BOSS_TIERS) - 2)
+            with right_column_6:
+                weather = st.selectbox("Weather", list(WEATHER_BOOSTS), index=None, placeholder="No weather boost")
+
+            attackers = rank_raid_attackers(species2, top=10, tier=raid_tier, weather=weather)
+
+            attackers_df = pd.DataFrame({
+                "Pokémon": [attacker["species"].name for attacker in attackers],
+                "Fast Move": [attacker["fast_move"].name for attacker in attackers],
+                "Charged Move": [attacker["charged_move"].name for attacker in attackers],
+                "DPS": [round(attacker["dps"], 2) for attacker in attackers],
+                "TDO": [round(attacker["tdo"]) for attacker in attackers],
+                "Time to Win (s)": [round(attacker["time_to_win"]) for attacker in attackers]
+            })
+
+            st.write("Level 40 attackers with perfect IVs.")
+            if any(attacker["estimated"] for attacker in attackers):
+                st.write("Some moves have no raid stats in the game data, so their trainer battle stats are used.")
+            st.dataframe(attackers_df, hide_index=True)
+
+        st.write("---")
+
+        st.write("#### Move Rankings")
+
+        left_column_7, middle_column_7, right_column_7 = st.columns(3)
+
+        with left_column_7:
+            metric_labels = {"dpe": "Damage per energy (charged moves)", "dpt": "Damage per turn (fast moves)",
+                             "ept": "Energy per turn (fast moves)"}
+            metric = st.selectbox("Metric", list(metric_labels), format_func=metric_labels.get)
+        with middle_column_7:
+            ranked_type = st.selectbox("Type", list(Type), format_func=lambda type: type.value, index=None,
+                                       placeholder="Every type")
+        with right_column_7:
+            max_energy = st.number_input("Energy below (0 for any)", min_value=0, max_value=100, value=0)
+
+        ranked_moves = rank_moves(metric, k=10, type=ranked_type, max_energy=max_energy or None)
+
+        ranked_moves_df = pd.DataFrame({
+            "Move": [row["move"].name for row in ranked_moves],
+            "Type": [row["move"].type.value for row in ranked_moves],
+            "Energy": [row["move"].energy for row in ranked_moves],
+            metric.upper(): [round(row[metric], 2) for row in ranked_moves]
+        })
+
+        st.dataframe(ranked_moves_df, hide_index=True)
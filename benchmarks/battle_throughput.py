@@ -0,0 +1,52 @@
+"""
+Measures how many 1v1 battles :class:`pokemon.Battle` runs per second on one core.
+
+Random pairs of level 40 forms battle with their first fast move and first two charged moves.
+Run from the repository root:
+
+    python benchmarks/battle_throughput.py
+"""
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pokemon import Battle, Pokemon, get_game_data  # noqa: E402
+
+MATCHUPS = 500
+RUNS_PER_MATCHUP = 40
+SEED = 0
+
+
+def build_pokemon(species) -> tuple[Pokemon, list]:
+    pokemon = Pokemon(species=species, current_hp=0, hp_iv=15, attack_iv=15, defense_iv=15, level=40.0,
+                      shadow=False, attack_stages=0, defense_stages=0)
+    return pokemon, [species.fast_move_pool[0]] + species.charged_move_pool[:2]
+
+
+def main():
+    species = [
+        species for species in get_game_data().species
+        if species.base_attack is not None and species.fast_move_pool and species.charged_move_pool
+    ]
+    rng = random.Random(SEED)
+
+    start = time.perf_counter()
+    battles = [Battle(*build_pokemon(rng.choice(species)), *build_pokemon(rng.choice(species)))
+               for _ in range(MATCHUPS)]
+    setup = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for battle in battles:
+        for _ in range(RUNS_PER_MATCHUP):
+            battle.run()
+    elapsed = time.perf_counter() - start
+
+    print(f"setup: {MATCHUPS / setup:,.0f} battles/s")
+    print(f"runs:  {MATCHUPS * RUNS_PER_MATCHUP / elapsed:,.0f} battles/s")
+
+
+if __name__ == "__main__":
+    main()
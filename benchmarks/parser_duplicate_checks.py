@@ -0,0 +1,77 @@
+"""
+Measures how long the game master parser takes with its indexed duplicate checks, against the linear scans
+of every parsed Pokémon it used before, and checks that both give the same JSON.
+
+Pass the path to a game master file, e.g. the ``raw_game_data.json`` saved by ``parser.fetch_game_data``.
+Without one, the latest game master is downloaded first. Run from the repository root:
+
+    python benchmarks/parser_duplicate_checks.py [raw_game_data.json]
+"""
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pokemon.game_data import parser  # noqa: E402
+
+
+def count_forms_by_scanning(pokedex_number):
+    form_number = 0
+
+    for pokemon_key in parser.pokemon_json:
+        if parser.pokemon_json.get(pokemon_key).get("pokedex_number") == pokedex_number:
+            form_number += 1
+
+    return form_number
+
+
+def check_for_existing_pokemon_by_scanning(pokemon_data):
+    if pokemon_data.get("name") in parser.WHITELISTED_POKEMON:
+        return False
+
+    return any(parser.is_same(pokemon, pokemon_data) for pokemon in parser.pokemon_json.values())
+
+
+def parse(game_master_path: str) -> tuple[float, str]:
+    # parsing changes the templates it reads, so every run reads a fresh copy
+    with open(game_master_path, "r") as f:
+        data = json.load(f)
+
+    parser.reset()
+
+    start = time.perf_counter()
+    parser.parse_game_master(data)
+    elapsed = time.perf_counter() - start
+
+    return elapsed, json.dumps(parser.moves_json, indent=4) + json.dumps(parser.pokemon_json, indent=4)
+
+
+def main():
+    if len(sys.argv) > 1:
+        game_master_path = sys.argv[1]
+    else:
+        parser.fetch_game_data()
+        game_master_path = "raw_game_data.json"
+
+    indexed, indexed_output = parse(game_master_path)
+
+    count_forms, check_for_existing_pokemon = parser.count_forms, parser.check_for_existing_pokemon
+    parser.count_forms, parser.check_for_existing_pokemon = (count_forms_by_scanning,
+                                                             check_for_existing_pokemon_by_scanning)
+    try:
+        scanning, scanning_output = parse(game_master_path)
+    finally:
+        parser.count_forms, parser.check_for_existing_pokemon = count_forms, check_for_existing_pokemon
+
+    if indexed_output != scanning_output:
+        raise SystemExit("The indexed and scanning parsers disagree")
+
+    print(f"Pokémon parsed: {len(parser.pokemon_json):,}")
+    print(f"scanning: {scanning:.3f} s")
+    print(f"indexed:  {indexed:.3f} s ({scanning / indexed:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
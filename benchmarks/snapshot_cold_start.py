@@ -0,0 +1,62 @@
+"""
+Compares the cold start of the game data loaded from the JSON files and from the compiled snapshot.
+
+Every measurement runs in a fresh interpreter so nothing is cached between runs.
+Run from the repository root:
+
+    python benchmarks/snapshot_cold_start.py
+"""
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+RUNS = 5
+
+CHILD = """
+import json, resource, time
+import pokemon.registry, pokemon.snapshot
+
+start = time.perf_counter()
+game_data = {loader}
+game_data.species_by_name["Charizard"]
+lookup = time.perf_counter()
+game_data.species
+materialised = time.perf_counter()
+
+print(json.dumps({{
+    "lookup": lookup - start,
+    "materialised": materialised - start,
+    "rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+}}))
+"""
+
+LOADERS = {
+    "json": "pokemon.registry.load_game_data()",
+    "snapshot": "pokemon.snapshot.load_compiled_game_data()",
+}
+
+
+def run(loader: str) -> dict:
+    output = subprocess.run([sys.executable, "-c", CHILD.format(loader=loader)], cwd=ROOT, check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output)
+
+
+def main():
+    # compile the snapshot up front so the first snapshot run is not a rebuild
+    run(LOADERS["snapshot"])
+
+    print(f"{'loader':<10}{'first lookup (ms)':>20}{'all species (ms)':>20}{'max RSS (MB)':>15}")
+    for name, loader in LOADERS.items():
+        results = [run(loader) for _ in range(RUNS)]
+        lookup = statistics.median(result["lookup"] for result in results) * 1000
+        materialised = statistics.median(result["materialised"] for result in results) * 1000
+        rss = statistics.median(result["rss"] for result in results) / 1024
+        print(f"{name:<10}{lookup:>20.1f}{materialised:>20.1f}{rss:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,19 @@
+from .breakpoints import *
+from .battle import *
 from .calculator import *
+from .counters import *
+from .efficiency import *
+from .inference import *
 from .megas import *
+from .meta import *
+from .montecarlo import *
 from .moves import *
+from .movesets import *
 from .pokemon import *
+from .raids import *
+from .rankings import *
+from .registry import *
+from .snapshot import *
+from .sweep import *
+from .timing import *
 from .type import *
\ No newline at end of file
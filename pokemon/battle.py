@@ -0,0 +1,391 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from .calculator import calculate_damage_ranges
+
+if TYPE_CHECKING:
+    from pokemon import Pokemon, Move
+
+MAX_ENERGY = 100
+MAX_SHIELDS = 2
+MAX_TURNS = 480  # 4 minutes of 0.5 second turns
+
+FAST_MOVE = 0
+CHARGED_MOVE = 1
+
+LOG_DTYPE = np.dtype([
+    ("turn", "<u2"),
+    ("side", "u1"),  # 0 for the first Pokémon, 1 for the second
+    ("action", "u1"),  # FAST_MOVE or CHARGED_MOVE
+    ("move", "u1"),  # index into the side's moveset, 0 is the fast move
+    ("damage", "<u2"),
+    ("shielded", "?"),
+    ("hp_1", "<u2"),
+    ("hp_2", "<u2"),
+    ("energy_1", "u1"),
+    ("energy_2", "u1"),
+])
+
+SCENARIO_DTYPE = np.dtype([
+    ("winner", "i1"),  # 0 for the first Pokémon, 1 for the second, -1 for a tie
+    ("hp_1", "<u2"),
+    ("hp_2", "<u2"),
+    ("turns", "<u2"),
+    ("rating", "<u2"),
+])
+
+
+def _check_moveset(moveset: list[Move]):
+    if not 2 <= len(moveset) <= 3:
+        raise ValueError("A moveset is one fast move followed by one or two charged moves")
+    if moveset[0].usage_type == "charge":
+        raise ValueError(f"{moveset[0].name} is not a fast move")
+    for move in moveset[1:]:
+        if move.usage_type != "charge":
+            raise ValueError(f"{move.name} is not a charged move")
+
+
+class Battle:
+    """
+    A deterministic 1v1 trainer battle between two Pokémon.
+
+    Every damage value, energy gain and cost is calculated once when the battle is created, so the same
+    battle can be run any number of times, e.g. with different shields, without recalculating them.
+
+    Each turn, both Pokémon that are free to act pick a move at the same time. A Pokémon with enough energy
+    throws a charged move, baiting with its cheapest one while the opponent has shields and otherwise
+    throwing the strongest one it can afford. Anyone else uses their fast move, which deals its damage and
+    gains its energy on its last turn. Fast moves land before charged moves, and when both Pokémon throw a
+    charged move on the same turn, the one with the higher attack goes first, the first Pokémon winning
+    ties. Shields are always used while any are left and every charged move swipes every bubble.
+
+    Attributes
+    ----------
+    pokemon: tuple[:class:`.Pokemon`, :class:`.Pokemon`]
+        Both Pokémon.
+    movesets: tuple[list[:class:`.Move`], list[:class:`.Move`]]
+        Both movesets, a fast move followed by one or two charged moves.
+    hp: tuple[int, int]
+        Both Pokémon's starting HP.
+    max_turns: int
+        The number of turns before the battle times out.
+    fast_damage, fast_energy, fast_turns: list[int]
+        Both sides' fast move damage, energy gain and duration in turns.
+    charged_damage, charged_cost: list[list[int]]
+        Both sides' charged move damage and energy cost, indexed like the moveset. Index 0 is unused.
+    choices: list[tuple[list[int], list[int]]]
+        The charged move both sides throw at every energy level, when the opponent has no shields and
+        when it has some, as an index into the moveset. 0 means not enough energy.
+    priority: int
+        The side whose charged move goes first when both are thrown on the same turn.
+
+    Raises
+    ------
+    ValueError
+        A moveset is not one fast move followed by one or two charged moves.
+    """
+
+    def __init__(self, pokemon1: Pokemon, moveset1: list[Move], pokemon2: Pokemon, moveset2: list[Move],
+                 max_turns: int = MAX_TURNS):
+        _check_moveset(moveset1)
+        _check_moveset(moveset2)
+
+        self.pokemon = (pokemon1, pokemon2)
+        self.movesets = (list(moveset1), list(moveset2))
+        self.hp = (pokemon1.get_true_hp(), pokemon2.get_true_hp())
+        self.max_turns = max_turns
+
+        self.fast_damage = [0, 0]
+        self.fast_energy = [0, 0]
+        self.fast_turns = [0, 0]
+        self.charged_damage = [[], []]
+        self.charged_cost = [[], []]
+        self.choices = [(), ()]
+
+        for side, (attacker, defender, moveset) in enumerate(((pokemon1, pokemon2, moveset1),
+                                                              (pokemon2, pokemon1, moveset2))):
+            fast_move = moveset[0]
+            self.fast_damage[side] = calculate_damage_ranges(attacker, defender, fast_move)[0]
+            self.fast_energy[side] = fast_move.energy
+            self.fast_turns[side] = max(fast_move.turns, 1)
+
+            # index 0 is the fast move, so charged move i sits at index i
+            charged_damage = [0] + [calculate_damage_ranges(attacker, defender, move)[-1] for move in moveset[1:]]
+            charged_cost = [0] + [move.energy for move in moveset[1:]]
+            self.charged_damage[side] = charged_damage
+            self.charged_cost[side] = charged_cost
+
+            # the charged move to throw at every energy level, without and with opponent shields, 0 for none
+            charged = range(1, len(moveset))
+            cheapest = min(charged, key=lambda index: charged_cost[index])
+            without_shields = [0] * (MAX_ENERGY + 1)
+            with_shields = [0] * (MAX_ENERGY + 1)
+
+            # weakest first, so every energy level ends up with the strongest move it affords
+            for move in sorted(charged, key=lambda index: (charged_damage[index], -index)):
+                without_shields[charged_cost[move]:] = [move] * (MAX_ENERGY + 1 - charged_cost[move])
+            with_shields[charged_cost[cheapest]:] = [cheapest] * (MAX_ENERGY + 1 - charged_cost[cheapest])
+
+            self.choices[side] = (without_shields, with_shields)
+
+        # charged move priority
+        self.priority = 1 if pokemon2.get_true_attack(include_shadow=True) > pokemon1.get_true_attack(
+            include_shadow=True) else 0
+
+        # allocated by the first logged run and reused by every run after it
+        self._log = None
+
+    def run(self, shields: tuple[int, int] = (MAX_SHIELDS, MAX_SHIELDS), log: bool = False) -> dict:
+        """
+        Runs the battle from full HP and no energy.
+
+        Parameters
+        ----------
+        shields : tuple[int, int]
+            Both Pokémon's shields, from 0 to 2.
+        log : bool
+            Whether to record every move in the result's ``log``.
+
+        Returns
+        -------
+        dict
+            The keys ``winner`` (0 for the first Pokémon, 1 for the second and None for a tie), ``hp`` and
+            ``energy`` (both Pokémon's at the end), ``shields`` (both Pokémon's shields left), ``turns``
+            (how long the battle lasted) and ``log``, a structured array of :data:`LOG_DTYPE` with one row
+            per move used, or None if ``log`` is False. A battle that times out is won by the Pokémon with
+            the larger share of its HP left.
+        """
+        # the state of both sides lives in locals, so a turn allocates nothing
+        fast_damage1, fast_damage2 = self.fast_damage
+        fast_energy1, fast_energy2 = self.fast_energy
+        fast_turns1, fast_turns2 = self.fast_turns
+        charged_damage1, charged_damage2 = self.charged_damage
+        charged_cost1, charged_cost2 = self.charged_cost
+        choices1, choices2 = self.choices
+        first = self.priority
+        max_turns = self.max_turns
+        row_count = 0
+
+        if log and self._log is None:
+            self._log = np.zeros(4 * max_turns + 4, dtype=LOG_DTYPE)
+        rows = self._log
+
+        hp1, hp2 = self.hp
+        shields1, shields2 = shields
+        energy1 = energy2 = 0
+        ready1 = ready2 = 0
+        land1 = land2 = -1
+
+        turn = 0
+
+        while turn < max_turns:
+            # pick moves
+            charged1 = charged2 = 0
+
+            if ready1 == turn:
+                charged1 = choices1[shields2 > 0][energy1]
+                if charged1:
+                    ready1 = turn + 1
+                else:
+                    land1 = turn + fast_turns1 - 1
+                    ready1 = turn + fast_turns1
+
+            if ready2 == turn:
+                charged2 = choices2[shields1 > 0][energy2]
+                if charged2:
+                    ready2 = turn + 1
+                else:
+                    land2 = turn + fast_turns2 - 1
+                    ready2 = turn + fast_turns2
+
+            # fast moves land at the same time
+            if land1 == turn:
+                land1 = -1
+                hp2 -= fast_damage1
+                energy1 = min(energy1 + fast_energy1, MAX_ENERGY)
+
+                if log:
+                    rows[row_count] = (turn, 0, FAST_MOVE, 0, fast_damage1, False, hp1, max(hp2, 0), energy1,
+                                       energy2)
+                    row_count += 1
+
+            if land2 == turn:
+                land2 = -1
+                hp1 -= fast_damage2
+                energy2 = min(energy2 + fast_energy2, MAX_ENERGY)
+
+                if log:
+                    rows[row_count] = (turn, 1, FAST_MOVE, 0, fast_damage2, False, max(hp1, 0), max(hp2, 0),
+                                       energy1, energy2)
+                    row_count += 1
+
+            if hp1 <= 0 or hp2 <= 0:
+                break
+
+            # charged moves go one at a time, in priority order
+            if charged1 or charged2:
+                for side in ((0, 1) if first == 0 else (1, 0)):
+                    if side == 0 and charged1:
+                        shielded = shields2 > 0
+                        damage = 1 if shielded else charged_damage1[charged1]
+                        shields2 -= shielded
+                        energy1 -= charged_cost1[charged1]
+                        hp2 -= damage
+                    elif side == 1 and charged2:
+                        shielded = shields1 > 0
+                        damage = 1 if shielded else charged_damage2[charged2]
+                        shields1 -= shielded
+                        energy2 -= charged_cost2[charged2]
+                        hp1 -= damage
+                    else:
+                        continue
+
+                    if log:
+                        rows[row_count] = (turn, side, CHARGED_MOVE, charged2 if side else charged1, damage,
+                                           shielded, max(hp1, 0), max(hp2, 0), energy1, energy2)
+                        row_count += 1
+
+                    if hp1 <= 0 or hp2 <= 0:
+                        break
+
+                if hp1 <= 0 or hp2 <= 0:
+                    break
+
+            # skip to the next turn where something happens
+            turn = ready1 if land1 < 0 else land1
+            if (ready2 if land2 < 0 else land2) < turn:
+                turn = ready2 if land2 < 0 else land2
+
+        hp1, hp2 = max(hp1, 0), max(hp2, 0)
+        hp_share = (hp1 / self.hp[0], hp2 / self.hp[1])
+
+        if hp_share[0] > hp_share[1]:
+            winner = 0
+        elif hp_share[1] > hp_share[0]:
+            winner = 1
+        else:
+            winner = None
+
+        return {
+            "winner": winner,
+            "hp": (hp1, hp2),
+            "energy": (energy1, energy2),
+            "shields": (shields1, shields2),
+            "turns": min(turn + 1, max_turns),
+            "log": rows[:row_count].copy() if log else None
+        }
+
+    def summarize(self, result: dict) -> tuple:
+        """
+        Packs a result of :meth:`run` into a row of :data:`SCENARIO_DTYPE`.
+
+        ``rating`` is the first Pokémon's battle rating from 0 to 1000: 500 times the share of the second
+        Pokémon's HP it took, plus 500 times the share of its own HP left. Above 500 is a win for the
+        first Pokémon.
+
+        Parameters
+        ----------
+        result : dict
+            The result of :meth:`run`.
+
+        Returns
+        -------
+        tuple
+            The row.
+        """
+        hp1, hp2 = result["hp"]
+
+        return (
+            -1 if result["winner"] is None else result["winner"],
+            hp1,
+            hp2,
+            result["turns"],
+            round(500 * (self.hp[1] - hp2) / self.hp[1] + 500 * hp1 / self.hp[0])
+        )
+
+    def run_shield_scenarios(self) -> np.ndarray:
+        """
+        Runs the battle once for every combination of 0, 1 and 2 shields on each side.
+
+        The damage values and the charged move to throw at every energy level are shared by all nine runs.
+
+        Returns
+        -------
+        np.ndarray
+            A 3x3 structured array of :data:`SCENARIO_DTYPE`, indexed by the first and the second
+            Pokémon's shields, see :meth:`summarize`.
+        """
+        scenarios = np.zeros((MAX_SHIELDS + 1, MAX_SHIELDS + 1), dtype=SCENARIO_DTYPE)
+
+        for shields1 in range(MAX_SHIELDS + 1):
+            for shields2 in range(MAX_SHIELDS + 1):
+                scenarios[shields1, shields2] = self.summarize(self.run((shields1, shields2)))
+
+        return scenarios
+
+
+def simulate_battle(pokemon1: Pokemon, moveset1: list[Move], pokemon2: Pokemon, moveset2: list[Move],
+                    shields: tuple[int, int] = (MAX_SHIELDS, MAX_SHIELDS), log: bool = True) -> dict:
+    """
+    Simulates a 1v1 trainer battle between two Pokémon.
+
+    Use :class:`Battle` directly to run the same matchup more than once.
+
+    Parameters
+    ----------
+    pokemon1 : Pokemon
+        The first Pokémon.
+    moveset1 : list[Move]
+        The first Pokémon's fast move followed by one or two charged moves.
+    pokemon2 : Pokemon
+        The second Pokémon.
+    moveset2 : list[Move]
+        The second Pokémon's fast move followed by one or two charged moves.
+    shields : tuple[int, int]
+        Both Pokémon's shields, from 0 to 2.
+    log : bool
+        Whether to record every move in the result's ``log``.
+
+    Returns
+    -------
+    dict
+        The result of :meth:`Battle.run`.
+
+    Raises
+    ------
+    ValueError
+        A moveset is not one fast move followed by one or two charged moves.
+    """
+    return Battle(pokemon1, moveset1, pokemon2, moveset2).run(shields, log)
+
+
+def simulate_shield_scenarios(pokemon1: Pokemon, moveset1: list[Move], pokemon2: Pokemon,
+                              moveset2: list[Move]) -> np.ndarray:
+    """
+    Simulates a 1v1 trainer battle between two Pokémon in all nine shield scenarios, from 0-0 to 2-2.
+
+    Parameters
+    ----------
+    pokemon1 : Pokemon
+        The first Pokémon.
+    moveset1 : list[Move]
+        The first Pokémon's fast move followed by one or two charged moves.
+    pokemon2 : Pokemon
+        The second Pokémon.
+    moveset2 : list[Move]
+        The second Pokémon's fast move followed by one or two charged moves.
+
+    Returns
+    -------
+    np.ndarray
+        The result of :meth:`Battle.run_shield_scenarios`.
+
+    Raises
+    ------
+    ValueError
+        A moveset is not one fast move followed by one or two charged moves.
+    """
+    return Battle(pokemon1, moveset1, pokemon2, moveset2).run_shield_scenarios()
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from .calculator import calculate_damage_batch, HALF_CIRCLE_RULE, TRAINER_CONSTANT, STAB_MULTIPLIER, \
+    SHADOW_ATTACK_MULTIPLIER, SHADOW_DEFENSE_MULTIPLIER
+from .pokemon import CP_MULTIPLIERS, get_type_index, get_type_multiplier
+from .sweep import get_type_indices
+
+if TYPE_CHECKING:
+    from pokemon import Pokemon, Move
+
+IVS = np.arange(16)
+
+# every level with a CP multiplier, 1.0 to 55.0 in steps of 0.5
+LEVELS = np.flatnonzero(~np.isnan(CP_MULTIPLIERS)) / 2
+LEVEL_CP_MULTIPLIERS = CP_MULTIPLIERS[~np.isnan(CP_MULTIPLIERS)]
+
+
+def _get_damage_function(attacker: Pokemon, defender: Pokemon, move: Move):
+    if move.usage_type == "charge":
+        raise ValueError("Breakpoints and bulkpoints are only defined for fast moves")
+
+    move_type = get_type_index(move.type)
+    attacker_types = np.array(get_type_indices(attacker.species.types))
+    defender_types = np.array(get_type_indices(defender.species.types))
+
+    def calculate_damage(attack: np.ndarray, defense: np.ndarray) -> np.ndarray:
+        return calculate_damage_batch(attack, defense, move.power, move_type, attacker_types, defender_types,
+                                      attacker.shadow, defender.shadow)
+
+    stab_multiplier = STAB_MULTIPLIER if move.type in attacker.species.types else 1.0
+    modifiers = TRAINER_CONSTANT * stab_multiplier * get_type_multiplier(move.type, defender.species.types)
+
+    # damage = int(scale * attack / defense) + 1, with the shadow multipliers folded into the scale
+    scale = HALF_CIRCLE_RULE * move.power * modifiers
+    if attacker.shadow:
+        scale *= SHADOW_ATTACK_MULTIPLIER
+    if defender.shadow:
+        scale /= SHADOW_DEFENSE_MULTIPLIER
+
+    return calculate_damage, scale
+
+
+def _first_level_reaching(stat_grid: np.ndarray, thresholds: np.ndarray, reaches) -> np.ndarray:
+    # stat_grid[level, iv] increases with the level, so the first level at or past each threshold is a binary search,
+    # after which the exact damage formula nudges each answer past any floating point rounding at the boundary
+    indices = np.stack([np.searchsorted(stat_grid[:, iv], thresholds) for iv in IVS], axis=1)
+
+    candidates = np.clip(indices, 0, len(LEVELS) - 1)
+    iv_grid = np.broadcast_to(IVS, candidates.shape)
+    reached = reaches(stat_grid[candidates, iv_grid], np.arange(len(thresholds))[:, np.newaxis])
+    indices = np.where((indices < len(LEVELS)) & ~reached, indices + 1, indices)
+
+    previous = np.clip(indices - 1, 0, len(LEVELS) - 1)
+    previous_reached = reaches(stat_grid[previous, iv_grid], np.arange(len(thresholds))[:, np.newaxis])
+    indices = np.where((indices > 0) & previous_reached, indices - 1, indices)
+
+    return indices
+
+
+def _to_levels(indices: np.ndarray) -> list[float | None]:
+    return [float(LEVELS[index]) if index < len(LEVELS) else None for index in indices.tolist()]
+
+
+def find_breakpoints(attacker: Pokemon, defender: Pokemon, move: Move) -> list[dict]:
+    """
+    Finds the levels and attack IVs at which an attacker's fast move deals one more damage to a defender.
+
+    The attacker's species, stat stages and shadow status are kept, and every level from 1.0 to 55.0 and
+    every attack IV is considered. The defender is used as is.
+
+    Parameters
+    ----------
+    attacker : Pokemon
+        The attacking Pokémon.
+    defender : Pokemon
+        The defending Pokémon.
+    move : Move
+        The attacker's fast move.
+
+    Returns
+    -------
+    list[dict]
+        One dictionary per damage value the move can deal, lowest first, with the keys ``damage``,
+        ``attack`` (the attack stat needed, before the shadow bonus) and ``levels``, a list holding the
+        lowest level that deals that damage for each attack IV from 0 to 15, or None if no level does.
+
+    Raises
+    ------
+    ValueError
+        The move is a charged move.
+    """
+    calculate_damage, scale = _get_damage_function(attacker, defender, move)
+
+    defense = defender.get_true_defense()
+    attack_grid = ((attacker.species.base_attack + IVS) * LEVEL_CP_MULTIPLIERS[:, np.newaxis]
+                   * attacker.get_stage_multiplier(attacker.attack_stages))
+
+    lowest_damage, highest_damage = calculate_damage(attack_grid[[0, -1], [0, -1]], defense).tolist()
+    damage_values = np.arange(lowest_damage, highest_damage + 1)
+
+    # damage >= d once scale * attack / defense >= d - 1
+    thresholds = (damage_values - 1) * defense / scale
+
+    def reaches(attack: np.ndarray, damage_index: np.ndarray) -> np.ndarray:
+        return calculate_damage(attack, defense) >= damage_values[damage_index]
+
+    indices = _first_level_reaching(attack_grid, thresholds, reaches)
+
+    return [
+        {
+            "damage": int(damage),
+            "attack": float(threshold),
+            "levels": _to_levels(level_indices)
+        }
+        for damage, threshold, level_indices in zip(damage_values, thresholds, indices)
+    ]
+
+
+def find_bulkpoints(attacker: Pokemon, defender: Pokemon, move: Move) -> list[dict]:
+    """
+    Finds the levels and defense IVs at which a defender takes one less damage from an attacker's fast move.
+
+    The defender's species, stat stages and shadow status are kept, and every level from 1.0 to 55.0 and
+    every defense IV is considered. The attacker is used as is. Attack and HP IVs do not change the damage
+    taken, so every one of the 4096 IV combinations shares the bulkpoints of its defense IV.
+
+    Parameters
+    ----------
+    attacker : Pokemon
+        The attacking Pokémon.
+    defender : Pokemon
+        The defending Pokémon.
+    move : Move
+        The attacker's fast move.
+
+    Returns
+    -------
+    list[dict]
+        One dictionary per damage value the move can deal, highest first, with the keys ``damage``,
+        ``defense`` (the defense stat needed, before the shadow penalty) and ``levels``, a list holding
+        the lowest level that takes at most that damage for each defense IV from 0 to 15, or None if
+        no level does.
+
+    Raises
+    ------
+    ValueError
+        The move is a charged move.
+    """
+    calculate_damage, scale = _get_damage_function(attacker, defender, move)
+
+    attack = attacker.get_true_attack()
+    defense_grid = ((defender.species.base_defense + IVS) * LEVEL_CP_MULTIPLIERS[:, np.newaxis]
+                    * defender.get_stage_multiplier(defender.defense_stages))
+
+    highest_damage, lowest_damage = calculate_damage(attack, defense_grid[[0, -1], [0, -1]]).tolist()
+    damage_values = np.arange(highest_damage, lowest_damage - 1, -1)
+
+    # damage <= d once scale * attack / defense < d, and defense past that threshold only ever lowers it
+    thresholds = scale * attack / damage_values
+
+    def reaches(defense: np.ndarray, damage_index: np.ndarray) -> np.ndarray:
+        return calculate_damage(attack, defense) <= damage_values[damage_index]
+
+    indices = _first_level_reaching(defense_grid, thresholds, reaches)
+
+    return [
+        {
+            "damage": int(damage),
+            "defense": float(threshold),
+            "levels": _to_levels(level_indices)
+        }
+        for damage, threshold, level_indices in zip(damage_values, thresholds, indices)
+    ]
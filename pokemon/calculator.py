@@ -2,7 +2,10 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
-from .pokemon import get_type_multiplier, get_type_circle
+import numpy as np
+
+from .pokemon import Type, get_type_multiplier, get_type_circle, get_type_index, get_defender_indices, \
+    get_type_multipliers
 
 if TYPE_CHECKING:
     from pokemon import Pokemon
@@ -29,19 +32,15 @@ def calculate_damage_ranges(attacker: Pokemon, defender: Pokemon, move: Move) ->
         If the move is a charge move, it will return a list of possible damage rolls.
     """
 
-    half_circle_rule = 0.5  # I made the name up
-
     attack = attacker.get_true_attack(include_shadow=True)
 
     defense = defender.get_true_defense(include_shadow=True)
 
-    trainer_constant = 1.3
-
-    stab_multiplier = 1.2 if move.type in attacker.species.types else 1.0
+    stab_multiplier = STAB_MULTIPLIER if move.type in attacker.species.types else 1.0
 
     type_multiplier = get_type_multiplier(move.type, defender.species.types)
 
-    modifiers = trainer_constant * stab_multiplier * type_multiplier
+    modifiers = TRAINER_CONSTANT * stab_multiplier * type_multiplier
 
     if move.usage_type == "charge":
 
@@ -49,19 +48,146 @@ def calculate_damage_ranges(attacker: Pokemon, defender: Pokemon, move: Move) ->
 
         damage_rolls.append(1)  # damage if the move is shielded
 
-        circles = get_type_circle(move.type)
-
-        base_percentage = 0.25
-
-        for _ in range(circles + 1):
+        for base_percentage in BUBBLE_PERCENTAGES[move.type]:
             damage = int(
-                half_circle_rule * move.power * attack / defense * base_percentage * modifiers
+                HALF_CIRCLE_RULE * move.power * attack / defense * base_percentage * modifiers
             ) + 1
             damage_rolls.append(damage)
-            base_percentage += 0.75 / circles
-            base_percentage = min(base_percentage, 1.0)
 
         return sorted(list(damage_rolls))  # cast set to list
 
     else:
-        return [int(half_circle_rule * move.power * attack / defense * modifiers) + 1]
+        return [int(HALF_CIRCLE_RULE * move.power * attack / defense * modifiers) + 1]
+
+
+def _get_bubble_percentages(circles: int) -> list[float]:
+    # the share of the move's power dealt after swiping 0, 1, ..., circles bubbles
+    bubble_percentages = []
+
+    base_percentage = 0.25
+
+    for _ in range(circles + 1):
+        bubble_percentages.append(base_percentage)
+        base_percentage += 0.75 / circles
+        base_percentage = min(base_percentage, 1.0)
+
+    return bubble_percentages
+
+
+def _compile_bubble_table() -> tuple[np.ndarray, np.ndarray]:
+    damage_roll_counts = np.array([len(BUBBLE_PERCENTAGES[type]) + 1 for type in Type], dtype=np.intp)
+
+    # column 0 is the shielded damage, padding columns deal no damage
+    bubble_table = np.zeros((len(Type), damage_roll_counts.max()), dtype=np.float64)
+    for type in Type:
+        bubble_table[get_type_index(type), 1:damage_roll_counts[get_type_index(type)]] = BUBBLE_PERCENTAGES[type]
+
+    bubble_table.flags.writeable = False
+    damage_roll_counts.flags.writeable = False
+
+    return bubble_table, damage_roll_counts
+
+
+HALF_CIRCLE_RULE = 0.5  # I made the name up
+TRAINER_CONSTANT = 1.3
+STAB_MULTIPLIER = 1.2
+SHADOW_ATTACK_MULTIPLIER = 6 / 5
+SHADOW_DEFENSE_MULTIPLIER = 5 / 6
+
+BUBBLE_PERCENTAGES = {type: _get_bubble_percentages(get_type_circle(type)) for type in Type}
+
+# BUBBLE_TABLE[type] holds the share of power dealt by every damage roll of a charged move of that type,
+# DAMAGE_ROLL_COUNTS[type] how many of those rolls are real
+BUBBLE_TABLE, DAMAGE_ROLL_COUNTS = _compile_bubble_table()
+
+MAX_DAMAGE_ROLLS = BUBBLE_TABLE.shape[1]
+
+
+def _get_batch_inputs(attack, defense, power, move_type, attacker_types, defender_types, attacker_shadow,
+                      defender_shadow) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    move_type = np.asarray(move_type, dtype=np.intp)
+    attacker_types = np.asarray(attacker_types, dtype=np.intp)
+    defender_types = np.asarray(defender_types, dtype=np.intp)
+
+    attack = np.asarray(attack, dtype=np.float64) * np.where(attacker_shadow, SHADOW_ATTACK_MULTIPLIER, 1.0)
+    defense = np.asarray(defense, dtype=np.float64) * np.where(defender_shadow, SHADOW_DEFENSE_MULTIPLIER, 1.0)
+
+    is_stab = (move_type == attacker_types[..., 0]) | (move_type == attacker_types[..., 1])
+    type_multiplier = get_type_multipliers(move_type, get_defender_indices(defender_types[..., 0],
+                                                                           defender_types[..., 1]))
+
+    modifiers = TRAINER_CONSTANT * np.where(is_stab, STAB_MULTIPLIER, 1.0) * type_multiplier
+
+    base_damage = HALF_CIRCLE_RULE * np.asarray(power, dtype=np.float64) * attack / defense
+
+    return base_damage, modifiers, move_type
+
+
+def calculate_damage_batch(attack: np.ndarray, defense: np.ndarray, power: np.ndarray, move_type: np.ndarray,
+                           attacker_types: np.ndarray, defender_types: np.ndarray,
+                           attacker_shadow: np.ndarray = False, defender_shadow: np.ndarray = False) -> np.ndarray:
+    """
+    Vectorized :func:`calculate_damage_ranges` for fast moves.
+
+    Every argument is broadcast against the others, so passing attackers, defenders and moves along
+    different axes calculates every combination at once.
+
+    Parameters
+    ----------
+    attack : np.ndarray
+        The attackers' attack stats, including stat stages but not the shadow bonus,
+        as returned by :meth:`.Pokemon.get_true_attack`.
+    defense : np.ndarray
+        The defenders' defense stats, including stat stages but not the shadow penalty,
+        as returned by :meth:`.Pokemon.get_true_defense`.
+    power : np.ndarray
+        The moves' power.
+    move_type : np.ndarray
+        The ordinals of the moves' types, see :func:`.get_type_index`.
+    attacker_types : np.ndarray
+        The ordinals of the attackers' types, with a trailing axis of length 2. Use -1 for no second type.
+    defender_types : np.ndarray
+        The ordinals of the defenders' types, with a trailing axis of length 2. Use -1 for no second type.
+    attacker_shadow : np.ndarray
+        Whether the attackers are Shadow Pokémon.
+    defender_shadow : np.ndarray
+        Whether the defenders are Shadow Pokémon.
+
+    Returns
+    -------
+    np.ndarray
+        The damage of every combination.
+    """
+    base_damage, modifiers, _ = _get_batch_inputs(attack, defense, power, move_type, attacker_types, defender_types,
+                                                  attacker_shadow, defender_shadow)
+
+    return (base_damage * modifiers).astype(np.int64) + 1
+
+
+def calculate_charged_damage_batch(attack: np.ndarray, defense: np.ndarray, power: np.ndarray,
+                                   move_type: np.ndarray, attacker_types: np.ndarray, defender_types: np.ndarray,
+                                   attacker_shadow: np.ndarray = False,
+                                   defender_shadow: np.ndarray = False) -> np.ndarray:
+    """
+    Vectorized :func:`calculate_damage_ranges` for charged moves.
+
+    Takes the same arguments as :func:`calculate_damage_batch`.
+
+    Returns
+    -------
+    np.ndarray
+        The damage rolls of every combination, with a trailing axis of length :data:`MAX_DAMAGE_ROLLS`.
+        Index 0 is the shielded damage and index ``n`` the damage after swiping ``n - 1`` bubbles.
+        Only the first ``DAMAGE_ROLL_COUNTS[move_type]`` rolls are real, the rest are 0.
+    """
+    base_damage, modifiers, move_type = _get_batch_inputs(attack, defense, power, move_type, attacker_types,
+                                                          defender_types, attacker_shadow, defender_shadow)
+
+    bubble_percentages = BUBBLE_TABLE[move_type]
+
+    damage_rolls = (base_damage[..., np.newaxis] * bubble_percentages * modifiers[..., np.newaxis]).astype(
+        np.int64) + 1
+    damage_rolls = np.where(bubble_percentages > 0.0, damage_rolls, 0)
+    damage_rolls[..., 0] = 1
+
+    return damage_rolls
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import heapq
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from .battle import Battle, MAX_TURNS
+from .calculator import calculate_damage_batch
+from .movesets import optimize_moveset
+from .pokemon import Pokemon, get_cp_multiplier, get_type_index
+from .sweep import get_sweep_table, get_type_indices
+
+if TYPE_CHECKING:
+    from pokemon import Move, Species
+
+
+def _get_optimistic_dpt(table, target: Pokemon, attack: np.ndarray) -> np.ndarray:
+    # the most damage per turn every species can deal to the target: its best fast move plus its energy spent
+    # on its best charged move per energy, whichever moves those are
+    damage = calculate_damage_batch(attack, target.get_true_defense(), table.power, table.move_type, table.types,
+                                    np.array(get_type_indices(target.species.types)), False, target.shadow)
+
+    fast = ~table.charged
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dpe = np.where(table.charged, damage / table.energy, 0.0)
+    best_dpe = np.maximum.reduceat(dpe, table.species_starts)
+
+    species_index = np.repeat(np.arange(len(table.species_starts)),
+                              np.diff(table.species_starts, append=len(table)))
+    cycle_dpt = np.where(fast, (damage + table.energy * best_dpe[species_index]) / table.turns, 0.0)
+
+    # no charged move, or no fast move, means no moveset
+    has_charged_move = np.logical_or.reduceat(table.charged, table.species_starts)
+    has_fast_move = np.logical_or.reduceat(fast, table.species_starts)
+
+    return np.where(has_charged_move & has_fast_move, np.maximum.reduceat(cycle_dpt, table.species_starts), 0.0)
+
+
+def _get_fewest_hits_taken(table, species: list[Species], target: Pokemon, target_moveset: list[Move],
+                           level: float, defense_iv: int, hp_iv: int, turns: np.ndarray) -> np.ndarray:
+    # the share of every species' HP the target's fast move must have taken after the given number of turns,
+    # even if the target throws a charged move whenever it can, since every throw needs the energy of fast moves
+    fast_move, cheapest_cost = target_moveset[0], min(move.energy for move in target_moveset[1:])
+    cp_multiplier = get_cp_multiplier(level)
+
+    base_defense = np.array([member.base_defense for member in species], dtype=np.float64)
+    base_hp = np.array([member.base_hp for member in species], dtype=np.float64)
+    defender_types = table.types[table.species_starts]
+
+    fast_damage = calculate_damage_batch(target.get_true_attack(), (base_defense + defense_iv) * cp_multiplier,
+                                         fast_move.power, get_type_index(fast_move.type),
+                                         np.array(get_type_indices(target.species.types)), defender_types,
+                                         target.shadow, False)
+    hp = np.maximum(((base_hp + hp_iv) * cp_multiplier).astype(np.int64), 10)
+
+    fast_turns = max(fast_move.turns, 1)
+    turns_per_fast_move = fast_turns + fast_move.energy / cheapest_cost
+    fast_moves = np.floor(np.maximum(turns - fast_turns, 0) / turns_per_fast_move)
+
+    return np.minimum(fast_moves * fast_damage / hp, 1.0)
+
+
+def find_counters(target: Pokemon, k: int = 10, metric: str = "turns_to_ko", target_moveset: list[Move] | None = None,
+                  shields: int = 1, level: float = 40.0, attack_iv: int = 15, defense_iv: int = 15, hp_iv: int = 15,
+                  candidates: list[Species] | None = None) -> dict:
+    """
+    Finds the best counters to a target among every Pokémon form and their movesets.
+
+    Every form gets an optimistic bound first, from the damage of its best fast move and the damage per
+    energy of its best charged move against the target, all forms at once. Forms are then scored exactly
+    from the most promising down, and the search stops as soon as no form left can beat the ``k``-th best
+    score, so most forms are never scored exactly.
+
+    With the ``"turns_to_ko"`` metric, a form's score is the turns its quickest moveset takes to faint the
+    target, see :func:`.optimize_moveset`. With the ``"rating"`` metric, the form battles the target with its
+    quickest moveset and its score is its battle rating, see :meth:`.Battle.summarize`.
+
+    Parameters
+    ----------
+    target : Pokemon
+        The target.
+    k : int
+        The number of counters to find.
+    metric : Literal["turns_to_ko", "rating"]
+        How counters are ranked.
+    target_moveset : list[Move] | None
+        The target's fast move followed by one or two charged moves. Needed for the ``"rating"`` metric.
+    shields : int
+        The number of shields the target has, and with the ``"rating"`` metric, the counters too.
+    level : float
+        The counters' level.
+    attack_iv : int
+        The counters' attack IV.
+    defense_iv : int
+        The counters' defense IV.
+    hp_iv : int
+        The counters' HP IV.
+    candidates : list[Species] | None
+        The forms to search. If None, every form with base stats and moves is searched.
+
+    Returns
+    -------
+    dict
+        The keys ``counters``, a list of up to ``k`` dictionaries, best first, with the keys ``species``,
+        ``fast_move``, ``charged_moves``, ``turns_to_ko`` and, with the ``"rating"`` metric, ``rating``;
+        ``evaluated``, the number of forms scored exactly, and ``pruned``, the number of forms skipped.
+
+    Raises
+    ------
+    ValueError
+        The metric is unknown, or the ``"rating"`` metric is used without a target moveset.
+    """
+    if metric not in ("turns_to_ko", "rating"):
+        raise ValueError(f"Unknown metric: {metric}")
+    if metric == "rating" and not target_moveset:
+        raise ValueError("The rating metric needs the target's moveset")
+
+    table = get_sweep_table()
+    species = [table.species[start] for start in table.species_starts.tolist()]
+
+    attack = (table.base_attack + attack_iv) * get_cp_multiplier(level)
+    optimistic_dpt = _get_optimistic_dpt(table, target, attack)
+
+    # no form faints the target in fewer turns, shielded charged moves dealing 1 damage each
+    hp = target.get_true_hp()
+    with np.errstate(divide="ignore"):
+        fewest_turns = np.maximum(hp - shields, 1) / optimistic_dpt
+
+    if metric == "turns_to_ko":
+        # lower is better
+        bounds = fewest_turns
+    else:
+        # a form takes the whole target's HP at best, and only keeps what the target's fast moves left it
+        hits_taken = _get_fewest_hits_taken(table, species, target, target_moveset, level, defense_iv, hp_iv,
+                                            np.minimum(fewest_turns, MAX_TURNS))
+        bounds = -(500 + 500 * (1 - hits_taken))
+
+    allowed = np.isfinite(bounds) & (optimistic_dpt > 0)
+    if candidates is not None:
+        candidate_names = {member.name for member in candidates}
+        allowed &= np.array([member.name in candidate_names for member in species])
+
+    order = [index for index in np.argsort(bounds, kind="stable").tolist() if allowed[index]]
+
+    # a max heap of the k best scores so far, as (-score, order) so the worst of them is on top
+    best = []
+    evaluated = 0
+
+    for position, index in enumerate(order):
+        if len(best) == k and bounds[index] >= -best[0][0]:
+            break
+
+        counter = Pokemon(
+            species=species[index],
+            current_hp=0,
+            hp_iv=hp_iv,
+            attack_iv=attack_iv,
+            defense_iv=defense_iv,
+            level=level,
+            shadow=False,
+            attack_stages=0,
+            defense_stages=0
+        )
+        moveset = optimize_moveset(counter, [target], shields=shields, top=1)[0]
+        evaluated += 1
+
+        row = {
+            "species": species[index],
+            "fast_move": moveset["fast_move"],
+            "charged_moves": moveset["charged_moves"],
+            "turns_to_ko": moveset["turns_to_ko"]
+        }
+
+        if metric == "turns_to_ko":
+            score = moveset["turns_to_ko"]
+        else:
+            battle = Battle(counter, [moveset["fast_move"]] + moveset["charged_moves"], target, target_moveset)
+            row["rating"] = battle.summarize(battle.run((shields, shields)))[-1]
+            score = -row["rating"]
+
+        if len(best) < k:
+            heapq.heappush(best, (-score, -position, row))
+        elif score < -best[0][0]:
+            heapq.heapreplace(best, (-score, -position, row))
+
+    return {
+        "counters": [row for _, _, row in sorted(best, key=lambda entry: (-entry[0], -entry[1]))],
+        "evaluated": evaluated,
+        "pruned": len(order) - evaluated
+    }
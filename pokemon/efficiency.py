@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import os
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from .calculator import STAB_MULTIPLIER
+from .pokemon import Type, get_type_index
+
+if TYPE_CHECKING:
+    from pokemon import Move
+    from .registry import GameData
+
+# damage per turn and energy per turn rank fast moves, damage per energy ranks charged moves
+FAST_MOVE_METRICS = ("dpt", "ept")
+CHARGED_MOVE_METRICS = ("dpe",)
+METRICS = FAST_MOVE_METRICS + CHARGED_MOVE_METRICS
+
+
+class MoveIndex:
+    """
+    Every move's efficiency as columns, with the moves pre-sorted by every metric.
+
+    Every metric has one permutation of the moves it applies to, best first, and one per type, stored next
+    to each other like the snapshot's move pools, so a query only reads the moves it returns and the moves
+    of its type it skips.
+
+    Attributes
+    ----------
+    moves: tuple[:class:`.Move`, ...]
+        The moves, in game data order.
+    power, energy, turns: np.ndarray
+        Every move's power, energy gained or spent, and duration in turns.
+    move_type: np.ndarray
+        Every move's type ordinal.
+    charged: np.ndarray
+        Whether every move is a charged move.
+    dpt, ept: np.ndarray
+        Every fast move's damage and energy per turn, NaN for charged moves.
+    dpe: np.ndarray
+        Every charged move's damage per energy, NaN for fast moves.
+    """
+
+    def __init__(self, moves: list[Move]):
+        self.moves = tuple(moves)
+
+        self.power = np.array([move.power for move in moves], dtype=np.float64)
+        self.energy = np.array([move.energy for move in moves], dtype=np.float64)
+        self.turns = np.array([move.turns for move in moves], dtype=np.float64)
+        self.move_type = np.array([get_type_index(move.type) for move in moves], dtype=np.intp)
+        self.charged = np.array([move.usage_type == "charge" for move in moves], dtype=bool)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            turns = np.maximum(self.turns, 1.0)
+            self.dpt = np.where(self.charged, np.nan, self.power / turns)
+            self.ept = np.where(self.charged, np.nan, self.energy / turns)
+            self.dpe = np.where(self.charged & (self.energy > 0), self.power / self.energy, np.nan)
+
+        # per metric: the best first permutation of every move, and of every type's moves with their offsets
+        self._orders = {}
+        self._type_orders = {}
+
+        for metric in METRICS:
+            values = getattr(self, metric)
+            ranked = np.flatnonzero(~np.isnan(values))
+
+            # ties keep game data order
+            order = ranked[np.argsort(-values[ranked], kind="stable")]
+            type_order = order[np.argsort(self.move_type[order], kind="stable")]
+            type_starts = np.searchsorted(self.move_type[type_order], np.arange(len(Type) + 1))
+
+            for array in (order, type_order, type_starts):
+                array.flags.writeable = False
+
+            self._orders[metric] = order
+            self._type_orders[metric] = (type_order, type_starts)
+
+    def __len__(self):
+        return len(self.moves)
+
+    def get_order(self, metric: str, type: Type | None = None) -> np.ndarray:
+        """
+        Returns the pre-sorted permutation of the moves a metric applies to.
+
+        Parameters
+        ----------
+        metric : Literal["dpt", "ept", "dpe"]
+            The metric.
+        type : Type | None
+            Only the moves of this type. None for every type.
+
+        Returns
+        -------
+        np.ndarray
+            A read-only array of indices into :attr:`moves`, best first.
+
+        Raises
+        ------
+        ValueError
+            The metric is unknown.
+        """
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric: {metric}")
+
+        if type is None:
+            return self._orders[metric]
+
+        type_order, type_starts = self._type_orders[metric]
+        type_index = get_type_index(type)
+
+        return type_order[type_starts[type_index]:type_starts[type_index + 1]]
+
+    def top(self, metric: str, k: int | None = 10, type: Type | None = None, min_energy: int | None = None,
+            max_energy: int | None = None, stab: bool = False) -> list[dict]:
+        """
+        Returns the most efficient moves by a metric.
+
+        Parameters
+        ----------
+        metric : Literal["dpt", "ept", "dpe"]
+            The metric. ``"dpt"`` and ``"ept"`` rank fast moves and ``"dpe"`` ranks charged moves.
+        k : int | None
+            The number of moves. None returns every move.
+        type : Type | None
+            Only the moves of this type. None for every type.
+        min_energy : int | None
+            Only the moves that gain or cost at least this much energy.
+        max_energy : int | None
+            Only the moves that gain or cost less than this much energy.
+        stab : bool
+            Whether the damage values include the same type attack bonus. Energy per turn is never changed.
+
+        Returns
+        -------
+        list[dict]
+            One dictionary per move, best first, with the keys ``move`` and the metric's name.
+
+        Raises
+        ------
+        ValueError
+            The metric is unknown.
+        """
+        order = self.get_order(metric, type)
+
+        if min_energy is not None or max_energy is not None:
+            energy = self.energy[order]
+            keep = np.ones(len(order), dtype=bool)
+            if min_energy is not None:
+                keep &= energy >= min_energy
+            if max_energy is not None:
+                keep &= energy < max_energy
+            order = order[keep]
+
+        order = order[:k]
+        # the same type attack bonus only changes damage, not energy
+        values = getattr(self, metric)[order] * (STAB_MULTIPLIER if stab and metric != "ept" else 1.0)
+
+        return [{"move": self.moves[index], metric: value} for index, value in zip(order.tolist(), values.tolist())]
+
+
+def _get_source_signature() -> tuple[tuple[int, int], ...]:
+    from .registry import moves_file, pokemon_file  # resolve circular import
+
+    return tuple((stat.st_mtime_ns, stat.st_size) for stat in map(os.stat, (moves_file, pokemon_file)))
+
+
+@lru_cache(maxsize=1)
+def _get_source_digest(source_signature: tuple[tuple[int, int], ...]) -> bytes:
+    # the JSON files are only hashed again after they were written
+    from .snapshot import get_source_digest  # resolve circular import
+
+    return get_source_digest()
+
+
+@lru_cache(maxsize=1)
+def _build_move_index(source_digest: bytes) -> MoveIndex:
+    from .registry import get_game_data, load_game_data  # resolve circular import
+
+    game_data = get_game_data()
+
+    if game_data.source_digest != source_digest:
+        # the shared game data is only loaded once per process, so the changed JSON files are loaded here
+        from .snapshot import load_compiled_game_data  # resolve circular import
+
+        try:
+            game_data = load_compiled_game_data()
+        except OSError:
+            game_data = load_game_data()
+
+    return MoveIndex(list(game_data.moves))
+
+
+def get_move_index() -> MoveIndex:
+    """
+    Returns the move index of the game data JSON files.
+
+    The index is built on the first call and rebuilt whenever the content of the JSON files changes, e.g.
+    after ``parser.update``, even though the shared game data of :func:`.get_game_data` is not reloaded.
+
+    Returns
+    -------
+    MoveIndex
+        The move index.
+    """
+    return _build_move_index(_get_source_digest(_get_source_signature()))
+
+
+def rank_moves(metric: str, k: int | None = 10, type: Type | None = None, min_energy: int | None = None,
+               max_energy: int | None = None, stab: bool = False) -> list[dict]:
+    """
+    Returns the most efficient moves of the shared game data by a metric, see :meth:`MoveIndex.top`.
+
+    For example, ``rank_moves("dpe", type=Type.GHOST, max_energy=50)`` returns the 10 Ghost charged moves
+    with the most damage per energy among those costing less than 50 energy.
+
+    Parameters
+    ----------
+    metric : Literal["dpt", "ept", "dpe"]
+        The metric.
+    k : int | None
+        The number of moves. None returns every move.
+    type : Type | None
+        Only the moves of this type. None for every type.
+    min_energy : int | None
+        Only the moves that gain or cost at least this much energy.
+    max_energy : int | None
+        Only the moves that gain or cost less than this much energy.
+    stab : bool
+        Whether the damage values include the same type attack bonus. Energy per turn is never changed.
+
+    Returns
+    -------
+    list[dict]
+        One dictionary per move, best first, with the keys ``move`` and the metric's name.
+
+    Raises
+    ------
+    ValueError
+        The metric is unknown.
+    """
+    return get_move_index().top(metric, k, type, min_energy, max_energy, stab)
@@ -1,10 +1,45 @@
+import copy
+import hashlib
 import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, nullcontext
 
 import requests
 
+path = os.path.dirname(os.path.abspath(__file__))
+
+GAME_MASTER_URL = "https://raw.githubusercontent.com/PokeMiners/game_masters/master/latest/latest.json"
+
+# how much of the game master is read at a time when streaming it
+STREAM_CHUNK_SIZE = 1 << 16
+
+# every downloaded game master is kept under its SHA-256, next to the validators of the URL it came from
+CACHE_DIR = path + "/game_master_cache"
+CACHE_INDEX_FILE = "index.json"
+
+# seconds to wait for the server to connect and to send each chunk
+FETCH_TIMEOUT = 60
+
+# the game data the registry loads
+MOVES_FILE = path + "/moves.json"
+POKEMON_FILE = path + "/pokemon.json"
+
+# the content hash and parsed result of every template of the previous run, and the changes it made
+MANIFEST_FILE = path + "/game_master_manifest.json"
+CHANGELOG_FILE = path + "/changelog.json"
+
+# how many templates a worker process parses at a time when templates are parsed in parallel
+PARALLEL_BATCH_SIZE = 256
+
 moves_json = {}
 pokemon_json = {}
 
+# pokemon_json indexed for the checks made while parsing: entries per Pokédex number and per fingerprint
+pokedex_form_counts = {}
+fingerprint_counts = {}
+
 BLACKLISTED_POKEMON_FORMS = ["UNOWN", "SPINDA", "CASTFORM", "BURMY", "WORMADAM", "CHERRIM", "SHELLOS", "GASTRODON",
                              "BASCULIN", "DEERLING", "SAWSBUCK", "FURFROU", "PUMPKABOO", "GOURGEIST"]
 
@@ -79,28 +114,153 @@ SKIPPED_POKEMON_IDS = [
 ]
 
 
-def is_same(pokemon1, pokemon2):
-    return (pokemon1["species"] == pokemon2["species"] and
-            pokemon1["types"] == pokemon2["types"] and
-            pokemon1["base_attack"] == pokemon2["base_attack"] and
-            pokemon1["base_defense"] == pokemon2["base_defense"] and
-            pokemon1["base_hp"] == pokemon2["base_hp"] and
-            pokemon1["fast_move_pool"] == pokemon2["fast_move_pool"] and
-            pokemon1["charged_move_pool"] == pokemon2["charged_move_pool"]
+def get_fingerprint(pokemon):
+    # every field two entries must share to be the same Pokémon, hashable
+    return (pokemon["species"],
+            tuple(pokemon["types"]),
+            pokemon["base_attack"],
+            pokemon["base_defense"],
+            pokemon["base_hp"],
+            tuple(pokemon["fast_move_pool"]),
+            tuple(pokemon["charged_move_pool"])
             )
 
 
-def fetch_game_data():
-    raw_data = requests.get(
-        "https://raw.githubusercontent.com/PokeMiners/game_masters/master/latest/latest.json").json()
+def is_same(pokemon1, pokemon2):
+    return get_fingerprint(pokemon1) == get_fingerprint(pokemon2)
 
-    data_dict = {"main": raw_data}
 
-    with open("raw_game_data.json", "w") as f:
-        json.dump(data_dict, f, indent=4)
+def add_pokemon(pokemon):
+    replaced = pokemon_json.get(pokemon["name"])
+
+    if replaced is not None:
+        pokedex_form_counts[replaced["pokedex_number"]] -= 1
+        fingerprint_counts[get_fingerprint(replaced)] -= 1
+
+    pokemon_json[pokemon["name"]] = pokemon
+
+    pokedex_number, fingerprint = pokemon["pokedex_number"], get_fingerprint(pokemon)
+    pokedex_form_counts[pokedex_number] = pokedex_form_counts.get(pokedex_number, 0) + 1
+    fingerprint_counts[fingerprint] = fingerprint_counts.get(fingerprint, 0) + 1
+
+
+def count_forms(pokedex_number):
+    return pokedex_form_counts.get(pokedex_number, 0)
+
+
+def reset():
+    moves_json.clear()
+    pokemon_json.clear()
+    pokedex_form_counts.clear()
+    fingerprint_counts.clear()
+
+
+def load_cache_index(cache_dir=CACHE_DIR):
+    try:
+        with open(os.path.join(cache_dir, CACHE_INDEX_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def get_cached_game_master(url, cache_dir=CACHE_DIR):
+    # the path of the last copy downloaded from a URL, None if there is none
+    cached = load_cache_index(cache_dir).get(url)
+    if not cached:
+        return None
+
+    cached_path = os.path.join(cache_dir, f"{cached['sha256']}.json")
+    return cached_path if os.path.exists(cached_path) else None
+
+
+def download_game_master(url, cache_dir=CACHE_DIR, timeout=FETCH_TIMEOUT):
+    # downloads the game master unless the cached copy is still current, and returns the cached copy's path
+    index = load_cache_index(cache_dir)
+    cached = index.get(url, {})
+    cached_path = get_cached_game_master(url, cache_dir)
+
+    headers = {}
+    if cached_path:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    with requests.get(url, headers=headers, stream=True, timeout=timeout) as response:
+        if response.status_code == 304 and cached_path:
+            return cached_path
+
+        response.raise_for_status()
+
+        os.makedirs(cache_dir, exist_ok=True)
+        digest = hashlib.sha256()
+        temporary_path = os.path.join(cache_dir, f"download.{os.getpid()}.tmp")
+
+        try:
+            with open(temporary_path, "wb") as f:
+                for chunk in response.iter_content(STREAM_CHUNK_SIZE):
+                    digest.update(chunk)
+                    f.write(chunk)
+
+            cached_path = os.path.join(cache_dir, f"{digest.hexdigest()}.json")
+            os.replace(temporary_path, cached_path)
+        finally:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+
+        index[url] = {
+            "sha256": digest.hexdigest(),
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified")
+        }
+
+    # a copy no URL points to any more is removed
+    previous_digest = cached.get("sha256")
+    if previous_digest and all(entry["sha256"] != previous_digest for entry in index.values()):
+        previous_path = os.path.join(cache_dir, f"{previous_digest}.json")
+        if os.path.exists(previous_path):
+            os.remove(previous_path)
+
+    temporary_path = os.path.join(cache_dir, f"{CACHE_INDEX_FILE}.{os.getpid()}.tmp")
+    with open(temporary_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=4)
+    os.replace(temporary_path, os.path.join(cache_dir, CACHE_INDEX_FILE))
+
+    return cached_path
+
+
+def fetch_game_master(source=None, cache_dir=CACHE_DIR, timeout=FETCH_TIMEOUT, mirror=None):
+    # the path of a local copy of the game master. A URL, e.g. of a local HTTP server standing in for
+    # PokeMiners, is downloaded into the cache with the validators of the cached copy, so an unchanged game
+    # master is not downloaded again. Any other source is a game master file. When the download fails, e.g.
+    # without network access, the cached copy of the URL is used, or else the mirror, a game master file
+    source = source or GAME_MASTER_URL
+
+    if not source.startswith(("http://", "https://")):
+        if not os.path.isfile(source):
+            raise ValueError(f"No game master at {source}")
+        return source
+
+    try:
+        return download_game_master(source, cache_dir, timeout)
+    except requests.RequestException:
+        fallback = get_cached_game_master(source, cache_dir) or mirror
+        if fallback is None:
+            raise
+        if not os.path.isfile(fallback):
+            raise ValueError(f"No game master at {fallback}")
+        return fallback
 
-    with open("raw_game_data.json", "r") as f:
-        data = json.load(f)
+
+def fetch_game_data(source=None):
+    with open(fetch_game_master(source), "r", encoding="utf-8") as f:
+        raw_data = json.load(f)
+
+    # game masters are lists of templates, saved ones are wrapped like {"main": [...]}
+    data = raw_data if isinstance(raw_data, dict) else {"main": raw_data}
+
+    with open("raw_game_data.json", "w") as f:
+        json.dump(data, f, indent=4)
 
     return data
 
@@ -115,11 +275,7 @@ def parse_pokemon_data(template_id, data):
     base_defense = pokemon_data.get("stats", {}).get("baseDefense")
     base_hp = pokemon_data.get("stats", {}).get("baseStamina")
     pokedex_number = int(template_id.split("V")[1].split("_POKEMON")[0])
-    form_number = 0
-
-    for pokemon_key in pokemon_json:
-        if pokemon_json.get(pokemon_key).get("pokedex_number") == pokedex_number:
-            form_number += 1
+    form_number = 0  # set once the templates before this one are parsed, see place_pokemon
 
     if name in SKIPPED_POKEMON_IDS:
         return None
@@ -483,28 +639,11 @@ def get_pokemon_category(pokemon_data) -> list:
 
 
 def check_for_existing_pokemon(pokemon_data):
-    for pokemon in pokemon_json:
-
-        if pokemon_data.get("name") in WHITELISTED_POKEMON:
-            break
-
-        pokemon_compared = pokemon_json[pokemon]
-
-        if is_same(pokemon_compared, {
-            "name": pokemon_data.get("name"),
-            "species": pokemon_data.get("species"),
-            "types": pokemon_data.get("types"),
-            "base_attack": pokemon_data.get("base_attack"),
-            "base_defense": pokemon_data.get("base_defense"),
-            "base_hp": pokemon_data.get("base_hp"),
-            "fast_move_pool": pokemon_data.get("fast_move_pool"),
-            "charged_move_pool": pokemon_data.get("charged_move_pool"),
-            "pokedex_number": pokemon_data.get("pokedex_number")
-        }):
-            return True
-    else:
+    if pokemon_data.get("name") in WHITELISTED_POKEMON:
         return False
 
+    return fingerprint_counts.get(get_fingerprint(pokemon_data), 0) > 0
+
 
 def apply_manual_changes(pokemon_data):
     name = pokemon_data["name"]
@@ -606,18 +745,28 @@ def process_temp_evo_overrides(pokemon_data, raw_data):
         }
 
 
-def process_pokemon_data(data):
+def parse_pokemon_template(data):
+    # everything about a Pokémon template that does not depend on the templates before it
     template_id = data.get("templateId")
 
     if any(word in template_id for word in BLACKLISTED_WORDS):
-        return []
+        return None
 
     pokemon_data = parse_pokemon_data(template_id, data)
     if not pokemon_data:
-        return []
+        return None
 
-    if check_for_existing_pokemon(pokemon_data):
-        return []
+    # the fields the duplicate check compares, from before the manual changes
+    candidate = {
+        "name": pokemon_data.get("name"),
+        "species": pokemon_data.get("species"),
+        "types": list(pokemon_data.get("types")),
+        "base_attack": pokemon_data.get("base_attack"),
+        "base_defense": pokemon_data.get("base_defense"),
+        "base_hp": pokemon_data.get("base_hp"),
+        "fast_move_pool": list(pokemon_data.get("fast_move_pool")),
+        "charged_move_pool": list(pokemon_data.get("charged_move_pool"))
+    }
 
     pokemon_data = apply_manual_changes(pokemon_data)
 
@@ -643,7 +792,25 @@ def process_pokemon_data(data):
         for data in temp_evo_override_data:
             final_pokemon_data.append(data)
 
-    return final_pokemon_data
+    return {
+        "candidate": candidate,
+        "pokedex_number": pokemon_data.get("pokedex_number"),
+        "entries": final_pokemon_data
+    }
+
+
+def place_pokemon(parsed):
+    # the entries of a parsed Pokémon template to add after the templates before it, none if it is a duplicate
+    if not parsed or check_for_existing_pokemon(parsed["candidate"]):
+        return []
+
+    parsed["entries"][0]["form_number"] = count_forms(parsed["pokedex_number"])
+
+    return parsed["entries"]
+
+
+def process_pokemon_data(data):
+    return place_pokemon(parse_pokemon_template(data))
 
 
 def process_pokemon_name(name, species):
@@ -712,33 +879,128 @@ def process_pokemon_move(entry):
     return move_data
 
 
-def update():
-    data = fetch_game_data()
+def process_pve_move(entry):
+    move_data: dict = entry["moveSettings"]
 
-    for entry in data["main"]:
+    move_name = move_data["movementId"]
 
-        template_id = entry["templateId"]
-        query = entry["data"]
+    if move_name in MANUAL_MOVE_CHANGES:
+        move_name = MANUAL_MOVE_CHANGES[move_name]
+
+    # the raid and gym stats, attached to the trainer battle move with the same ID
+    pve_data = {
+        "power": move_data.get("power", 0),
+        "energyDelta": abs(move_data.get("energyDelta", 0)),
+        "durationMs": move_data.get("durationMs", 0),
+        "damageWindowStartMs": move_data.get("damageWindowStartMs", 0)
+    }
+
+    return move_name, pve_data
+
+
+@contextmanager
+def open_game_master(source=None, mirror=None):
+    # a text stream of the game master, from a local file or from the cached copy of a URL
+    with open(fetch_game_master(source, mirror=mirror), "r", encoding="utf-8") as f:
+        yield f
+
+
+def iter_templates(stream):
+    # decodes the game master's templates one at a time, so only one template and one chunk are held at once
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    end_of_file = False
+    started = False
+
+    while True:
+        # skip to the next template
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+            if position < len(buffer) or end_of_file:
+                break
+            buffer, position = stream.read(STREAM_CHUNK_SIZE), 0
+            end_of_file = not buffer
+
+        if not started:
+            # the game master is a list of templates, a saved copy is wrapped as {"main": [...]}
+            if position == len(buffer) or buffer[position] not in "[{":
+                raise ValueError("The game master is not a list of templates")
+            if buffer[position] == "{":
+                while "[" not in buffer[position:] and not end_of_file:
+                    chunk = stream.read(STREAM_CHUNK_SIZE)
+                    buffer, end_of_file = buffer + chunk, not chunk
+                position = buffer.find("[", position)
+                if position < 0:
+                    raise ValueError("The game master is not a list of templates")
+            position += 1
+            started = True
+            continue
+
+        if position == len(buffer):
+            raise ValueError("The game master ends before its last template")
+        if buffer[position] == "]":
+            return
+
+        try:
+            template, position = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if end_of_file:
+                raise
+            # the template continues in the next chunk
+            chunk = stream.read(STREAM_CHUNK_SIZE)
+            buffer, position, end_of_file = buffer[position:] + chunk, 0, not chunk
+            continue
 
-        if template_id.startswith("COMBAT_V"):
-            move_data = process_pokemon_move(query)
-            moves_json[move_data["uniqueId"]] = move_data
+        yield template
 
-    for entry in data["main"]:
 
-        template_id = entry["templateId"]
-        data = entry["data"]
+def get_template_hash(entry):
+    return hashlib.blake2b(json.dumps(entry, sort_keys=True, separators=(",", ":")).encode("utf-8"),
+                           digest_size=16).hexdigest()
 
-        if (template_id.startswith("V0") or template_id.startswith(
-                "V1")) and "POKEMON" in template_id:
 
-            pokemon_data = process_pokemon_data(data)
+def parse_template(entry):
+    # the result of one template, which does not depend on any other template, or None if nothing is parsed
+    template_id = entry["templateId"]
+    data = entry["data"]
+    result = {}
 
-            if not pokemon_data:
-                continue
+    if template_id.startswith("COMBAT_V"):
+        result["move"] = process_pokemon_move(data)
+    elif "moveSettings" in data:
+        result["pve"] = process_pve_move(data)
 
-            for pokemon in pokemon_data:
-                pokemon_json[pokemon["name"]] = pokemon
+    if (template_id.startswith("V0") or template_id.startswith(
+            "V1")) and "POKEMON" in template_id:
+        result["pokemon"] = parse_pokemon_template(data)
+
+    return result or None
+
+
+def assemble(results):
+    # builds moves_json and pokemon_json from the parsed templates, in game master order
+    reset()
+
+    pve_moves = {}
+
+    for result in results:
+        # the results are kept for the next run, so they are never changed
+        result = copy.deepcopy(result)
+
+        if "move" in result:
+            moves_json[result["move"]["uniqueId"]] = result["move"]
+        if "pve" in result:
+            move_name, pve_data = result["pve"]
+            pve_moves[move_name] = pve_data
+        if "pokemon" in result:
+            for pokemon in place_pokemon(result["pokemon"]):
+                add_pokemon(pokemon)
+
+    for move_name, pve_data in pve_moves.items():
+        if move_name in moves_json:
+            moves_json[move_name]["pve"] = pve_data
 
     # handle hidden power
     # remove "HIDDEN_POWER_FAST"
@@ -762,15 +1024,186 @@ def update():
             for pokemon_type in hidden_power_types:
                 pokemon_json[pokemon]["fast_move_pool"].append(f"HIDDEN_POWER_{pokemon_type}")
 
-    with open("moves.json", "w") as f:
-        json.dump(moves_json, f, indent=4)
 
-    with open("pokemon.json", "w") as f:
-        json.dump(pokemon_json, f, indent=4)
+def parse_game_master(data):
+    parse_templates(data["main"])
+
+
+def parse_templates(templates):
+    assemble([result for result in map(parse_template, templates) if result is not None])
+
+
+def get_parser_digest():
+    # cached results are only reused by the same parser, since they depend on its manual changes
+    with open(__file__, "rb") as f:
+        return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+
+
+def load_manifest(manifest_path=MANIFEST_FILE):
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    if manifest.get("parser") != get_parser_digest():
+        return {}
+
+    # template IDs are not guaranteed to be unique, so every ID maps its hashes to their results
+    previous = {}
+    for template_id, template_hash, result in manifest["templates"]:
+        previous.setdefault(template_id, {})[template_hash] = result
+
+    return previous
+
+
+def parse_template_batch(entries):
+    return [parse_template(entry) for entry in entries]
+
+
+def get_worker_count(workers):
+    return (os.cpu_count() or 1) if workers is None else max(workers, 1)
+
+
+def parse_templates_incrementally(templates, manifest_path=MANIFEST_FILE, workers=1, timings=None):
+    # with more than one worker, the templates to parse are sent to worker processes in batches and their
+    # results put back in game master order, so the output is the same as with one
+    workers = get_worker_count(workers)
+    timings = {} if timings is None else timings
+    start = time.perf_counter()
+
+    previous = load_manifest(manifest_path)
+    manifest = []
+    counts = {"added": 0, "changed": 0, "unchanged": 0}
+    seen = set()
+
+    with ProcessPoolExecutor(workers) if workers > 1 else nullcontext() as executor:
+        # the manifest rows of the templates waiting for a batch, and of every batch sent
+        pending, batches = [], []
+
+        for entry in templates:
+            template_id, template_hash = entry["templateId"], get_template_hash(entry)
+            known = previous.get(template_id, {})
+            result = None
+
+            if template_hash in known:
+                counts["unchanged"] += 1
+                result = known[template_hash]
+            else:
+                counts["changed" if template_id in previous else "added"] += 1
+                if executor is None:
+                    result = parse_template(entry)
+                else:
+                    pending.append((len(manifest), entry))
+
+            seen.add(template_id)
+            manifest.append([template_id, template_hash, result])
+
+            if len(pending) == PARALLEL_BATCH_SIZE:
+                rows, entries = zip(*pending)
+                batches.append((rows, executor.submit(parse_template_batch, entries)))
+                pending = []
+
+        if pending:
+            rows, entries = zip(*pending)
+            batches.append((rows, executor.submit(parse_template_batch, entries)))
+
+        for rows, batch in batches:
+            for row, result in zip(rows, batch.result()):
+                manifest[row][2] = result
+
+    counts["removed"] = len(previous.keys() - seen)
+    timings["parse"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    assemble([result for _, _, result in manifest if result is not None])
+    timings["assemble"] = time.perf_counter() - start
+
+    temporary_path = f"{manifest_path}.{os.getpid()}.tmp"
+    with open(temporary_path, "w", encoding="utf-8") as f:
+        json.dump({"parser": get_parser_digest(), "templates": manifest}, f)
+    os.replace(temporary_path, manifest_path)
+
+    return counts
+
+
+def get_changes(path, parsed, key):
+    # the keys added, changed and removed since the output file was last written
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+    except (OSError, ValueError):
+        previous = {}
+
+    if isinstance(previous, list):
+        previous = {entry[key]: entry for entry in previous}
+
+    return {
+        "added": [name for name in parsed if name not in previous],
+        "changed": [name for name in parsed if name in previous and previous[name] != parsed[name]],
+        "removed": [name for name in previous if name not in parsed]
+    }
+
+
+def write_if_changed(path, text):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            if f.read() == text:
+                return False
+    except OSError:
+        pass
+
+    with open(path, "w") as f:
+        f.write(text)
+
+    return True
+
+
+def ingest_game_master(source=None, manifest_path=MANIFEST_FILE, mirror=None, workers=1, timings=None):
+    timings = {} if timings is None else timings
+    start = time.perf_counter()
+
+    with open_game_master(source, mirror) as stream:
+        timings["fetch"] = time.perf_counter() - start
+        return parse_templates_incrementally(iter_templates(stream), manifest_path, workers, timings)
+
+
+def update(source=None, manifest_path=MANIFEST_FILE, mirror=None, workers=1):
+    # source is a local game master file or a URL, the latest game master by default, see fetch_game_master.
+    # Only the templates that changed since the run that wrote the manifest are parsed again, by as many
+    # worker processes as workers, or one per CPU if None
+    timings = {}
+    templates = ingest_game_master(source, manifest_path, mirror, workers, timings)
+    start = time.perf_counter()
+
+    changelog = {
+        "templates": templates,
+        "moves": get_changes(MOVES_FILE, moves_json, "uniqueId"),
+        "pokemon": get_changes(POKEMON_FILE, pokemon_json, "name")
+    }
+
+    # the snapshot is recompiled the next time the game data is loaded, see load_compiled_game_data
+    write_if_changed(MOVES_FILE, json.dumps(moves_json, indent=4))
+    write_if_changed(POKEMON_FILE, json.dumps(pokemon_json, indent=4))
+
+    timings["write"] = time.perf_counter() - start
+    changelog["timings"] = {"workers": get_worker_count(workers), **timings}
+
+    with open(CHANGELOG_FILE, "w") as f:
+        json.dump(changelog, f, indent=4)
+
+    return changelog
+
+
+def print_timings(timings):
+    print(f"workers: {timings['workers']}")
+    for step in ("fetch", "parse", "assemble", "write"):
+        print(f"{step + ':':<9} {timings[step]:.3f} s")
+    print(f"{'total:':<9} {sum(timings[step] for step in ('fetch', 'parse', 'assemble', 'write')):.3f} s")
 
 
 def print_pokemon():
-    with open("pokemon.json", "r") as f:
+    with open(POKEMON_FILE, "r") as f:
         data = json.load(f)
 
     for pokemon in data:
@@ -778,5 +1211,14 @@ def print_pokemon():
             print(f"{pokemon} ({data[pokemon]['display_name']})")
 
 if __name__ == "__main__":
-    update()
+    import argparse
+
+    argument_parser = argparse.ArgumentParser(description="Updates the game data from the game master.")
+    argument_parser.add_argument("source", nargs="?", help="a game master file or URL, the latest by default")
+    argument_parser.add_argument("--mirror", help="a game master file to use if the download fails")
+    argument_parser.add_argument("--workers", type=int, default=1,
+                                 help="the worker processes parsing templates, 0 for one per CPU")
+    arguments = argument_parser.parse_args()
+
+    print_timings(update(arguments.source, mirror=arguments.mirror, workers=arguments.workers or None)["timings"])
     # print_pokemon()
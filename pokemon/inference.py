@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from .breakpoints import IVS, LEVELS, LEVEL_CP_MULTIPLIERS
+from .calculator import calculate_damage_batch, calculate_charged_damage_batch
+from .pokemon import CP_MULTIPLIERS_SQUARED, get_level_index, get_type_index, stat_stages
+from .sweep import get_type_indices
+
+if TYPE_CHECKING:
+    from pokemon import Pokemon, Species, Move
+
+CANDIDATE_DTYPE = np.dtype([
+    ("level", "<f4"),
+    ("attack_iv", "u1"),
+    ("defense_iv", "u1"),
+    ("hp_iv", "u1"),
+    ("cp", "<u4"),
+])
+
+
+def infer_defender_stats(attacker: Pokemon, defender_species: Species, observations: list[tuple[Move, int]],
+                         cp: int | None = None, shadow: bool = False, defense_stages: int = 0,
+                         level_cap: float = 55.0) -> np.ndarray:
+    """
+    Finds every level and IV spread of a defender that is consistent with the damage it was observed taking.
+
+    Damage only depends on the defender's defense, which only ever lowers the damage as it grows. The
+    defense of every level and defense IV is sorted once, each observation keeps the band of defenses
+    that deal exactly its damage, and only the defenses left in every band are expanded into their
+    attack and HP IVs.
+
+    Parameters
+    ----------
+    attacker : Pokemon
+        The attacking Pokémon, as it was when the damage was dealt.
+    defender_species : Species
+        The defending Pokémon's species.
+    observations : list[tuple[Move, int]]
+        Every move the attacker used and the damage it dealt. A charged move is consistent with any of its
+        damage rolls, so the number of bubbles swiped does not need to be known.
+    cp : int | None
+        The defender's CP, if known.
+    shadow : bool
+        Whether the defender is a Shadow Pokémon.
+    defense_stages : int
+        The defender's defense stat stages.
+    level_cap : float
+        The highest level to consider.
+
+    Returns
+    -------
+    np.ndarray
+        A structured array of :data:`CANDIDATE_DTYPE`, ordered by level, then attack, defense and HP IV.
+    """
+    level_count = get_level_index(level_cap) - get_level_index(1.0) + 1
+
+    # defense of every (level, defense IV) cell, flattened and sorted so every damage value is one contiguous band
+    defense_grid = ((defender_species.base_defense + IVS) * LEVEL_CP_MULTIPLIERS[:level_count, np.newaxis]
+                    * stat_stages.get(defense_stages, 1.0)).ravel()
+    order = np.argsort(defense_grid, kind="stable")
+    defenses = defense_grid[order]
+
+    attack = attacker.get_true_attack()
+    attacker_types = np.array(get_type_indices(attacker.species.types))
+    defender_types = np.array(get_type_indices(defender_species.types))
+
+    consistent = np.ones(len(defenses), dtype=bool)
+
+    for move, damage in observations:
+        move_type = get_type_index(move.type)
+
+        if move.usage_type == "charge":
+            damage_rolls = calculate_charged_damage_batch(attack, defenses, move.power, move_type, attacker_types,
+                                                          defender_types, attacker.shadow, shadow)
+            consistent &= np.any(damage_rolls == damage, axis=-1)
+        else:
+            # fast move damage never goes up with defense, so the matching defenses are a binary search away
+            fast_damage = calculate_damage_batch(attack, defenses, move.power, move_type, attacker_types,
+                                                 defender_types, attacker.shadow, shadow)
+            start = np.searchsorted(-fast_damage, -damage, side="left")
+            end = np.searchsorted(-fast_damage, -damage, side="right")
+            band = np.zeros(len(defenses), dtype=bool)
+            band[start:end] = True
+            consistent &= band
+
+    level_indices, defense_ivs = np.divmod(order[consistent], len(IVS))
+
+    # expand every consistent cell into its 256 attack and HP IV combinations
+    level_indices = np.repeat(level_indices, len(IVS) ** 2)
+    defense_ivs = np.repeat(defense_ivs, len(IVS) ** 2)
+    attack_ivs = np.tile(np.repeat(IVS, len(IVS)), len(order[consistent]))
+    hp_ivs = np.tile(IVS, len(order[consistent]) * len(IVS))
+
+    candidate_cp = (
+        (defender_species.base_attack + attack_ivs)
+        * np.sqrt(defender_species.base_defense + defense_ivs)
+        * np.sqrt(defender_species.base_hp + hp_ivs)
+        * CP_MULTIPLIERS_SQUARED[level_indices + get_level_index(1.0)]
+        / 10
+    ).astype(np.int64)
+
+    matches = np.ones(len(candidate_cp), dtype=bool) if cp is None else candidate_cp == cp
+
+    candidates = np.empty(np.count_nonzero(matches), dtype=CANDIDATE_DTYPE)
+    candidates["level"] = LEVELS[level_indices[matches]]
+    candidates["attack_iv"] = attack_ivs[matches]
+    candidates["defense_iv"] = defense_ivs[matches]
+    candidates["hp_iv"] = hp_ivs[matches]
+    candidates["cp"] = candidate_cp[matches]
+
+    return np.sort(candidates, order=["level", "attack_iv", "defense_iv", "hp_iv"], kind="stable")
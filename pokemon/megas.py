@@ -1,10 +1,27 @@
 from __future__ import annotations
-import json
 
+from functools import cache
 from typing import TYPE_CHECKING
 
+import numpy as np
+
+from .pokemon import Type, get_type_index
+
 if TYPE_CHECKING:
-    from pokemon import Species, Type
+    from pokemon import Species
+
+# the types a Primal Reversion/Mega Evolution boosts on top of its own, by species
+EXTRA_BOOSTED_TYPES = {
+    "rayquaza": (Type.PSYCHIC,),
+    "groudon": (Type.GRASS,),
+    "kyogre": (Type.ELECTRIC, Type.ICE)
+}
+
+MEGA_PLAN_DTYPE = np.dtype([
+    ("mega", "<u2"),  # index into the planned megas
+    ("weight", "<f8"),
+    ("raw_count", "<u4"),
+])
 
 
 class PokemonWeight:
@@ -30,12 +47,61 @@ class PokemonWeight:
         if isinstance(pokemon, str):
             pokemon = Species.get_pokemon_species_by_name(name=pokemon)
             if not pokemon:
-                raise ValueError(f"Invalid Pokémon name: {str}")
+                raise ValueError(f"Invalid Pokémon name: {pokemon}")
 
         self.pokemon = pokemon
         self.weight = weight
 
 
+def get_type_mask(types: list[Type]) -> int:
+    """
+    Packs a list of types into an 18-bit mask, with bit ``n`` set for the type of ordinal ``n``.
+
+    Parameters
+    ----------
+    types: list[:class:`.Type`]
+        The types.
+
+    Returns
+    -------
+    :class:`int`
+        The mask.
+    """
+    mask = 0
+    for type in types:
+        mask |= 1 << get_type_index(type)
+
+    return mask
+
+
+def get_boosted_mask(mega: Species) -> int:
+    """
+    Returns the types a Mega Evolution/Primal Reversion boosts as a mask, see :func:`get_type_mask`.
+
+    Parameters
+    ----------
+    mega: :class:`.Species`
+        The Mega Evolution/Primal Reversion.
+
+    Returns
+    -------
+    :class:`int`
+        The mask of its own types plus any extra types its species boosts.
+    """
+    return get_type_mask([*mega.types, *EXTRA_BOOSTED_TYPES.get(mega.species.lower(), ())])
+
+
+@cache
+def _get_mega_index() -> tuple[tuple[Species, ...], np.ndarray]:
+    from .registry import get_game_data  # resolve circular import
+
+    megas = get_game_data().megas
+    boosted_masks = np.array([get_boosted_mask(mega) for mega in megas], dtype=np.uint32)
+    boosted_masks.flags.writeable = False
+
+    return megas, boosted_masks
+
+
 def is_boosted(mega: Species, target: Species) -> bool:
     """
     Determines if a Mega Evolution/Primal Reversion is boosted against a target.
@@ -52,18 +118,23 @@ def is_boosted(mega: Species, target: Species) -> bool:
     :class:`bool`
         Whether the Mega Evolution/Primal Reversion is boosted against the target.
     """
+    return bool(get_boosted_mask(mega) & get_type_mask(target.types))
 
-    boosted_types = mega.types
 
-    if mega.species.lower() == "rayquaza":
-        boosted_types.append(Type.PSYCHIC)
-    elif mega.species.lower() == "groudon":
-        boosted_types.append(Type.GRASS)
-    elif mega.species.lower() == "kyogre":
-        boosted_types.append(Type.ELECTRIC)
-        boosted_types.append(Type.ICE)
+def _get_weighted_targets(targets: list[Species] | list[PokemonWeight]) -> list[PokemonWeight]:
+    from pokemon import Species  # resolve circular import
+
+    targets_final = []
+
+    for target in targets:
+        if isinstance(target, Species):
+            targets_final.append(PokemonWeight(target, 1))
+        elif isinstance(target, str):
+            targets_final.append(PokemonWeight(Species.get_pokemon_species_by_name(name=target), 1))
+        else:
+            targets_final.append(target)
 
-    return any(_ in boosted_types for _ in target.types)
+    return targets_final
 
 
 def find_best_mega(targets: list[Species] | list[PokemonWeight], megas: list[Species] | None = None) -> list[dict]:
@@ -88,41 +159,103 @@ def find_best_mega(targets: list[Species] | list[PokemonWeight], megas: list[Spe
                 }
             ]
     """
-    from pokemon import Species  # resolve circular import
+    targets_final = _get_weighted_targets(targets)
 
-    targets_final = []
+    if megas:
+        boosted_masks = np.array([get_boosted_mask(mega) for mega in megas], dtype=np.uint32)
+    else:
+        megas, boosted_masks = _get_mega_index()
 
-    for target in targets:
-        if isinstance(target, Species):
-            targets_final.append(PokemonWeight(target, 1))
-        elif isinstance(target, str):
-            targets_final.append(PokemonWeight(Species.get_pokemon_species_by_name(name=target), 1))
-        else:
-            targets_final.append(target)
+    target_masks = np.array([get_type_mask(target.pokemon.types) for target in targets_final], dtype=np.uint32)
+    weights = np.array([target.weight for target in targets_final])
 
-    megas = megas or fetch_all_megas()
+    # one row per mega, one column per target
+    boosted = (boosted_masks[:, np.newaxis] & target_masks[np.newaxis, :]) != 0
 
-    mega_data: list[dict] = []
+    mega_weights = (boosted @ weights if len(targets_final) else np.zeros(len(megas), dtype=np.int64)).tolist()
+    raw_counts = boosted.sum(axis=1).tolist()
 
-    for mega in megas:
-        mega_weight: int = 0
-        mega_raw_count: int = 0
-        for target in targets_final:
-            if is_boosted(mega, target.pokemon):
-                mega_weight += target.weight
-                mega_raw_count += 1
-        mega_data.append(
-            {
-                "mega": mega,
-                "weight": mega_weight,
-                "raw_count": mega_raw_count
-            }
-        )
+    # sort by weight, megas with the same weight keep their order
+    order = sorted(range(len(megas)), key=lambda index: mega_weights[index], reverse=True)
 
-    # sort the mega_data by weight
-    mega_data.sort(key=lambda x: x["weight"], reverse=True)
+    return [
+        {
+            "mega": megas[index],
+            "weight": mega_weights[index],
+            "raw_count": raw_counts[index]
+        }
+        for index in order
+    ]
 
-    return mega_data
+
+def plan_megas(schedule: list[list[Species] | list[PokemonWeight]], megas: list[Species] | None = None) -> dict:
+    """
+    Finds the best Mega Evolution/Primal Reversion against every target list of a raid schedule at once.
+
+    Gives the same ranking as calling :func:`find_best_mega` on every target list, but targets are grouped
+    by their type mask, see :func:`get_type_mask`, so the whole schedule is scored with one matrix product
+    of the target weights per type mask and whether every mega is boosted against every type mask.
+
+    Parameters
+    ----------
+    schedule: list[list[Union[:class:`.Species`, :class:`PokemonWeight`]]]
+        The target lists, one per schedule slot.
+    megas: list[:class:`.Species`] | None
+        The Mega Evolutions/Primal Reversions. If None, every one of them is used.
+
+    Returns
+    -------
+    :class:`dict`
+        The keys ``megas``, the Mega Evolutions/Primal Reversions, and ``plans``, a structured array of
+        :data:`MEGA_PLAN_DTYPE` with a row per schedule slot and a column per mega. Every row is ranked by
+        weight, best first, and its ``mega`` field is an index into ``megas``.
+    """
+    if megas:
+        megas = list(megas)
+        boosted_masks = np.array([get_boosted_mask(mega) for mega in megas], dtype=np.uint32)
+    else:
+        megas, boosted_masks = _get_mega_index()
+        megas = list(megas)
+
+    # every target, flattened, as its slot, the column of its type mask and its weight
+    mask_columns = {}
+    slots, columns, weights = [], [], []
+
+    for slot, targets in enumerate(schedule):
+        for target in _get_weighted_targets(targets):
+            mask = get_type_mask(target.pokemon.types)
+            slots.append(slot)
+            columns.append(mask_columns.setdefault(mask, len(mask_columns)))
+            weights.append(target.weight)
+
+    slots = np.array(slots, dtype=np.intp)
+    columns = np.array(columns, dtype=np.intp)
+
+    # one row per slot, one column per type mask
+    mask_weights = np.zeros((len(schedule), len(mask_columns)), dtype=np.float64)
+    mask_counts = np.zeros((len(schedule), len(mask_columns)), dtype=np.int64)
+    np.add.at(mask_weights, (slots, columns), np.array(weights, dtype=np.float64))
+    np.add.at(mask_counts, (slots, columns), 1)
+
+    # one row per mega, one column per type mask
+    target_masks = np.array(list(mask_columns), dtype=np.uint32)
+    boosted = (boosted_masks[:, np.newaxis] & target_masks[np.newaxis, :]) != 0
+
+    mega_weights = mask_weights @ boosted.T
+    raw_counts = mask_counts @ boosted.T
+
+    # megas with the same weight keep their order, like find_best_mega
+    order = np.argsort(-mega_weights, axis=1, kind="stable")
+
+    plans = np.zeros(order.shape, dtype=MEGA_PLAN_DTYPE)
+    plans["mega"] = order
+    plans["weight"] = np.take_along_axis(mega_weights, order, axis=1)
+    plans["raw_count"] = np.take_along_axis(raw_counts, order, axis=1)
+
+    return {
+        "megas": megas,
+        "plans": plans
+    }
 
 
 def fetch_all_megas() -> list[Species]:
@@ -134,32 +267,4 @@ def fetch_all_megas() -> list[Species]:
     list[:class:`.Species`]
         A list of all Mega Evolutions/Primal Reversions.
     """
-    from pokemon import Species, parse_type_string  # resolve circular import
-
-    with open("pokemon/game_data/pokemon.json", "r") as f:
-        pokemon_json = json.load(f)
-
-    megas = []
-
-    for pokemon_json_key in pokemon_json:
-
-        name = Species.parse_pokemon_string(pokemon_json[pokemon_json_key]["name"])
-        species_name = pokemon_json[pokemon_json_key]["species"]
-
-        if (not name.startswith("Mega ")) and (not name.startswith("Primal ")):
-            continue
-
-        types = []
-        for raw_type_string in pokemon_json[pokemon_json_key]["types"]:
-            if raw_type_string:
-                types.append(parse_type_string(raw_type_string))
-
-        species = Species(
-            name=name,
-            species=species_name,
-            types=types
-        )
-
-        megas.append(species)
-
-    return megas
+    return list(_get_mega_index()[0])
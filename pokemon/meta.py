@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from .battle import Battle, MAX_SHIELDS, SCENARIO_DTYPE
+from .pokemon import Pokemon, Species
+
+MANIFEST_FILE = "matrix.json"
+
+DEFAULT_TILE_SIZE = 32
+
+# the meta list, handed to every worker process once when it starts
+_worker_entries: list[dict] = []
+
+
+def _get_tile_path(directory: str, row_tile: int, column_tile: int) -> str:
+    return os.path.join(directory, f"tile_{row_tile:04d}_{column_tile:04d}.npy")
+
+
+def _build_entry(entry: dict) -> tuple[Pokemon, list]:
+    from .registry import get_game_data  # resolve circular import
+
+    game_data = get_game_data()
+
+    species = game_data.species_by_name.get(entry["species"]) or game_data.species_by_key.get(
+        Species.re_parse_pokemon_string(entry["species"]))
+    if species is None or species.base_attack is None:
+        raise ValueError(f"Invalid Pokémon name: {entry['species']}")
+
+    moveset = []
+    for name in entry["moveset"]:
+        move = game_data.find_move(name)
+        if move is None:
+            raise ValueError(f"Invalid move name: {name}")
+        moveset.append(move)
+
+    pokemon = Pokemon(
+        species=species,
+        current_hp=0,
+        hp_iv=entry.get("hp_iv", 15),
+        attack_iv=entry.get("attack_iv", 15),
+        defense_iv=entry.get("defense_iv", 15),
+        level=float(entry.get("level", 40.0)),
+        shadow=entry.get("shadow", False),
+        attack_stages=0,
+        defense_stages=0
+    )
+
+    return pokemon, moveset
+
+
+def _initialize_worker(entries: list[dict]):
+    from .registry import get_game_data  # resolve circular import
+
+    global _worker_entries
+    _worker_entries = entries
+
+    # every worker maps the same compiled snapshot, so the game data pages are shared and read-only
+    get_game_data()
+
+
+def _run_tile(rows: range, columns: range, shields: tuple[int, int], tile_path: str) -> tuple[int, int, float]:
+    start = time.process_time()
+
+    built = {index: _build_entry(_worker_entries[index]) for index in {*rows, *columns}}
+
+    tile = np.zeros((len(rows), len(columns)), dtype=SCENARIO_DTYPE)
+
+    for row, row_index in enumerate(rows):
+        pokemon1, moveset1 = built[row_index]
+
+        for column, column_index in enumerate(columns):
+            pokemon2, moveset2 = built[column_index]
+
+            battle = Battle(pokemon1, moveset1, pokemon2, moveset2)
+            tile[row, column] = battle.summarize(battle.run(shields))
+
+    # written under a temporary name first, so a crash never leaves a partial tile behind
+    temporary_path = f"{tile_path}.{os.getpid()}.tmp.npy"
+    np.save(temporary_path, tile)
+    os.replace(temporary_path, tile_path)
+
+    return os.getpid(), tile.size, time.process_time() - start
+
+
+def _write_manifest(directory: str, entries: list[dict], shields: tuple[int, int], tile_size: int) -> dict:
+    from .snapshot import get_source_digest  # resolve circular import
+
+    manifest = {
+        "entries": entries,
+        "shields": list(shields),
+        "tile_size": tile_size,
+        "game_data": get_source_digest().hex()
+    }
+    manifest_path = os.path.join(directory, MANIFEST_FILE)
+
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as file:
+            existing_manifest = json.load(file)
+    except FileNotFoundError:
+        os.makedirs(directory, exist_ok=True)
+        with open(manifest_path, "w", encoding="utf-8") as file:
+            json.dump(manifest, file)
+        return manifest
+
+    if existing_manifest != json.loads(json.dumps(manifest)):
+        raise ValueError(f"{directory} holds a different matrix, use an empty directory")
+
+    return manifest
+
+
+def run_meta_matrix(entries: list[dict], directory: str, shields: tuple[int, int] = (1, 1),
+                    tile_size: int = DEFAULT_TILE_SIZE, max_workers: int | None = None) -> dict:
+    """
+    Battles every Pokémon in a meta list against every other, spread across processes.
+
+    The matrix is split into square tiles of ``tile_size`` rows and columns, and every tile is saved to
+    ``directory`` as soon as it finishes. Running again with the same directory only runs the tiles that
+    are not saved yet, so an interrupted run picks up where it stopped. Read the results with
+    :func:`load_meta_matrix`.
+
+    Parameters
+    ----------
+    entries : list[dict]
+        The meta list. Every entry has the keys ``species`` (a Pokémon name) and ``moveset`` (the unique IDs
+        of a fast move followed by one or two charged moves), and optionally ``level`` (40.0 by default),
+        ``attack_iv``, ``defense_iv``, ``hp_iv`` (15 by default) and ``shadow`` (False by default).
+    directory : str
+        The directory the tiles are saved in.
+    shields : tuple[int, int]
+        The shields of the row and column Pokémon.
+    tile_size : int
+        The number of rows and columns per tile.
+    max_workers : int | None
+        The number of processes. None uses every CPU.
+
+    Returns
+    -------
+    dict
+        A report with the keys ``tiles`` (in the whole matrix), ``resumed`` (tiles already saved),
+        ``matchups`` (battled in this run), ``elapsed`` (seconds), ``throughput`` (matchups per second)
+        and ``utilisation``, the share of the run each worker process spent battling on the CPU, by
+        process ID.
+
+    Raises
+    ------
+    ValueError
+        An entry is invalid, or ``directory`` holds the tiles of a different matrix.
+    """
+    from .registry import get_game_data  # resolve circular import
+
+    if not all(0 <= shield <= MAX_SHIELDS for shield in shields):
+        raise ValueError(f"Shields must be between 0 and {MAX_SHIELDS}")
+
+    # validates every entry and compiles the snapshot the workers map, before any process starts
+    get_game_data()
+    for entry in entries:
+        _build_entry(entry)
+
+    _write_manifest(directory, entries, shields, tile_size)
+
+    tile_count = -(-len(entries) // tile_size)
+    tiles = [(row_tile, column_tile) for row_tile in range(tile_count) for column_tile in range(tile_count)]
+    pending = [tile for tile in tiles if not os.path.exists(_get_tile_path(directory, *tile))]
+
+    busy = {}
+    matchups = 0
+
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_initialize_worker,
+                             initargs=(entries,)) as executor:
+        futures = [
+            executor.submit(
+                _run_tile,
+                range(row_tile * tile_size, min((row_tile + 1) * tile_size, len(entries))),
+                range(column_tile * tile_size, min((column_tile + 1) * tile_size, len(entries))),
+                tuple(shields),
+                _get_tile_path(directory, row_tile, column_tile)
+            )
+            for row_tile, column_tile in pending
+        ]
+
+        for future in as_completed(futures):
+            pid, tile_matchups, tile_seconds = future.result()
+            busy[pid] = busy.get(pid, 0.0) + tile_seconds
+            matchups += tile_matchups
+
+    elapsed = time.perf_counter() - start
+
+    return {
+        "tiles": len(tiles),
+        "resumed": len(tiles) - len(pending),
+        "matchups": matchups,
+        "elapsed": elapsed,
+        "throughput": matchups / elapsed if elapsed else 0.0,
+        "utilisation": {pid: seconds / elapsed for pid, seconds in busy.items()}
+    }
+
+
+def load_meta_matrix(directory: str) -> np.ndarray:
+    """
+    Reads the results saved by :func:`run_meta_matrix`.
+
+    Parameters
+    ----------
+    directory : str
+        The directory the tiles are saved in.
+
+    Returns
+    -------
+    np.ndarray
+        An N x N structured array of :data:`.SCENARIO_DTYPE`, with a row and a column per meta list entry.
+        Row ``i``, column ``j`` is entry ``i`` battling entry ``j``.
+
+    Raises
+    ------
+    ValueError
+        ``directory`` holds no matrix, or some of its tiles have not been run yet.
+    """
+    try:
+        with open(os.path.join(directory, MANIFEST_FILE), "r", encoding="utf-8") as file:
+            manifest = json.load(file)
+    except FileNotFoundError:
+        raise ValueError(f"{directory} holds no matrix")
+
+    entry_count = len(manifest["entries"])
+    tile_size = manifest["tile_size"]
+    tile_count = -(-entry_count // tile_size)
+
+    matrix = np.zeros((entry_count, entry_count), dtype=SCENARIO_DTYPE)
+    missing = 0
+
+    for row_tile in range(tile_count):
+        for column_tile in range(tile_count):
+            try:
+                tile = np.load(_get_tile_path(directory, row_tile, column_tile))
+            except FileNotFoundError:
+                missing += 1
+                continue
+
+            matrix[row_tile * tile_size:(row_tile + 1) * tile_size,
+                   column_tile * tile_size:(column_tile + 1) * tile_size] = tile
+
+    if missing:
+        raise ValueError(f"{missing} of {tile_count ** 2} tiles have not been run yet")
+
+    return matrix
@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+from statistics import NormalDist
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from .battle import Battle, MAX_ENERGY, MAX_SHIELDS, SCENARIO_DTYPE
+from .calculator import DAMAGE_ROLL_COUNTS, calculate_charged_damage_batch, calculate_damage_batch
+from .moves import BUFF_STAGE_CHANGES
+from .pokemon import get_type_index, stat_stages
+from .sweep import get_type_indices
+
+if TYPE_CHECKING:
+    from pokemon import Pokemon, Move
+
+MIN_STAGE = min(stat_stages)
+MAX_STAGE = max(stat_stages)
+
+# the stat stage multipliers, indexed by stage - MIN_STAGE
+STAGE_MULTIPLIERS = np.array([stat_stages[stage] for stage in range(MIN_STAGE, MAX_STAGE + 1)])
+
+ATTACK = 0
+DEFENSE = 1
+
+
+def _get_damage_tables(attacker: Pokemon, defender: Pokemon, moveset: list[Move]) -> tuple[np.ndarray, np.ndarray]:
+    # axis 0 is the attacker's attack stage, axis 1 the defender's defense stage, both offset by MIN_STAGE
+    attack = (attacker.get_current_attack() * STAGE_MULTIPLIERS)[:, np.newaxis]
+    defense = (defender.get_current_defense() * STAGE_MULTIPLIERS)[np.newaxis, :]
+    attacker_types = np.array(get_type_indices(attacker.species.types))
+    defender_types = np.array(get_type_indices(defender.species.types))
+
+    fast_move = moveset[0]
+    fast_damage = calculate_damage_batch(attack, defense, fast_move.power, get_type_index(fast_move.type),
+                                         attacker_types, defender_types, attacker.shadow, defender.shadow)
+
+    # axis 0 is the index into the moveset, index 0 is unused, and the last axis the damage rolls
+    charged_damage = np.stack([
+        calculate_charged_damage_batch(attack, defense, move.power, get_type_index(move.type), attacker_types,
+                                       defender_types, attacker.shadow, defender.shadow)
+        for move in moveset
+    ])
+    charged_damage[0] = 0
+
+    return fast_damage, charged_damage
+
+
+def _get_buff_tables(moveset: list[Move]) -> tuple[np.ndarray, np.ndarray]:
+    # the chance of every move's buff, and the stages it changes as (attacker, target) x (attack, defense)
+    chances = np.zeros(len(moveset), dtype=np.float64)
+    changes = np.zeros((len(moveset), 2, 2), dtype=np.int64)
+
+    for index, move in enumerate(moveset):
+        if index == 0 or not move.buffs:
+            continue
+
+        chances[index] = move.buffs.get("buffActivationChance", 0.0)
+        changes[index] = np.reshape([move.buffs.get(key, 0) for key in BUFF_STAGE_CHANGES], (2, 2))
+
+    return chances, changes
+
+
+def _get_interval(successes: int, trials: int, z: float) -> tuple[float, float]:
+    # the Wilson score interval, which stays inside [0, 1] even when every trial is a success
+    share = successes / trials
+    centre = (share + z ** 2 / (2 * trials)) / (1 + z ** 2 / trials)
+    margin = z / (1 + z ** 2 / trials) * np.sqrt(share * (1 - share) / trials + z ** 2 / (4 * trials ** 2))
+
+    return float(max(centre - margin, 0.0)), float(min(centre + margin, 1.0))
+
+
+def simulate_battle_trials(pokemon1: Pokemon, moveset1: list[Move], pokemon2: Pokemon, moveset2: list[Move],
+                           trials: int = 10000, shields: tuple[int, int] = (1, 1),
+                           skill: float | tuple[float, float] = 0.9, seed: int | None = 0,
+                           confidence: float = 0.95) -> dict:
+    """
+    Simulates a 1v1 trainer battle many times, with random charged move bubbles and buff procs.
+
+    Both Pokémon pick their moves like in :class:`.Battle`, but every charged move that is not shielded swipes
+    a random number of bubbles, every bubble being swiped with the chance given by ``skill``, and every move
+    with a buff triggers it with the move's ``buffActivationChance``, shielded or not. Stat stages change the
+    damage of every move after them and stay between -4 and 4.
+
+    Every trial runs at the same time, one turn at a time, as array operations over all trials, and the same
+    ``seed`` always gives the same results.
+
+    Parameters
+    ----------
+    pokemon1 : Pokemon
+        The first Pokémon.
+    moveset1 : list[Move]
+        The first Pokémon's fast move followed by one or two charged moves.
+    pokemon2 : Pokemon
+        The second Pokémon.
+    moveset2 : list[Move]
+        The second Pokémon's fast move followed by one or two charged moves.
+    trials : int
+        The number of battles.
+    shields : tuple[int, int]
+        Both Pokémon's shields, from 0 to 2.
+    skill : float | tuple[float, float]
+        The chance of swiping every bubble, from 0 to 1, for both Pokémon or for each of them.
+        1 swipes every bubble, like :class:`.Battle`.
+    seed : int | None
+        The seed of the random number generator. None draws a fresh seed.
+    confidence : float
+        The confidence level of the intervals, from 0 to 1.
+
+    Returns
+    -------
+    dict
+        The keys ``trials``, a structured array of :data:`.SCENARIO_DTYPE` with one row per battle,
+        ``win_probability``, ``tie_probability`` and ``rating``, the first Pokémon's chance of winning, chance of
+        a tie and mean battle rating, and ``win_interval`` and ``rating_interval``, the confidence intervals of
+        the win probability and the mean rating.
+
+    Raises
+    ------
+    ValueError
+        A moveset is not one fast move followed by one or two charged moves, or an argument is out of range.
+    """
+    battle = Battle(pokemon1, moveset1, pokemon2, moveset2)
+
+    skill = (skill, skill) if np.isscalar(skill) else tuple(skill)
+    if trials < 1:
+        raise ValueError("At least one trial is needed")
+    if not all(0.0 <= chance <= 1.0 for chance in skill):
+        raise ValueError("Skill must be between 0 and 1")
+    if not all(0 <= shield <= MAX_SHIELDS for shield in shields):
+        raise ValueError(f"Shields must be between 0 and {MAX_SHIELDS}")
+    if not 0.0 < confidence < 1.0:
+        raise ValueError("Confidence must be between 0 and 1")
+
+    rng = np.random.default_rng(seed)
+
+    sides = ((pokemon1, pokemon2, battle.movesets[0]), (pokemon2, pokemon1, battle.movesets[1]))
+    damage_tables = [_get_damage_tables(attacker, defender, moveset) for attacker, defender, moveset in sides]
+    buff_tables = [_get_buff_tables(moveset) for _, _, moveset in sides]
+
+    # the bubbles of every charged move, indexed like the moveset
+    circles = [np.array([0] + [DAMAGE_ROLL_COUNTS[get_type_index(move.type)] - 2 for move in moveset[1:]])
+               for _, _, moveset in sides]
+    choices = [np.array(side_choices) for side_choices in battle.choices]
+    charged_cost = [np.array(cost) for cost in battle.charged_cost]
+    first = battle.priority
+
+    # the state of every trial, indexed by side and then by trial
+    hp = np.array([[battle.hp[0]], [battle.hp[1]]], dtype=np.int64).repeat(trials, axis=1)
+    energy = np.zeros((2, trials), dtype=np.int64)
+    shields_left = np.array([[shields[0]], [shields[1]]], dtype=np.int64).repeat(trials, axis=1)
+    ready = np.zeros((2, trials), dtype=np.int64)
+    land = np.full((2, trials), -1, dtype=np.int64)
+
+    # stages[side, ATTACK or DEFENSE], offset by MIN_STAGE
+    stages = np.array([[pokemon1.attack_stages, pokemon1.defense_stages],
+                       [pokemon2.attack_stages, pokemon2.defense_stages]], dtype=np.int64)
+    stages = np.clip(stages, MIN_STAGE, MAX_STAGE)[..., np.newaxis].repeat(trials, axis=2) - MIN_STAGE
+
+    running = np.ones(trials, dtype=bool)
+    end_turn = np.full(trials, battle.max_turns - 1, dtype=np.int64)
+
+    turn = 0
+
+    while turn < battle.max_turns and running.any():
+        # pick moves
+        charged = np.zeros((2, trials), dtype=np.int64)
+
+        for side in (0, 1):
+            picking = running & (ready[side] == turn)
+            choice = choices[side][(shields_left[1 - side] > 0).astype(np.intp), energy[side]]
+            charged[side] = np.where(picking, choice, 0)
+
+            fast = picking & (charged[side] == 0)
+            land[side] = np.where(fast, turn + battle.fast_turns[side] - 1, land[side])
+            ready[side] = np.where(picking, np.where(fast, turn + battle.fast_turns[side], turn + 1), ready[side])
+
+        # fast moves land at the same time, with the stages from before either of them
+        landing = running & (land == turn)
+        fast_damage = [damage_tables[side][0][stages[side, ATTACK], stages[1 - side, DEFENSE]] for side in (0, 1)]
+
+        for side in (0, 1):
+            hp[1 - side] -= np.where(landing[side], fast_damage[side], 0)
+            energy[side] = np.where(landing[side], np.minimum(energy[side] + battle.fast_energy[side], MAX_ENERGY),
+                                    energy[side])
+        land[landing] = -1
+
+        # charged moves go one at a time, in priority order
+        for side in ((0, 1) if first == 0 else (1, 0)):
+            throwing = running & (charged[side] > 0) & (hp[0] > 0) & (hp[1] > 0)
+            move = charged[side]
+
+            shielded = throwing & (shields_left[1 - side] > 0)
+            bubbles = rng.binomial(circles[side][move], skill[side])
+            damage = damage_tables[side][1][move, stages[side, ATTACK], stages[1 - side, DEFENSE], bubbles + 1]
+
+            hp[1 - side] -= np.where(shielded, 1, np.where(throwing, damage, 0))
+            shields_left[1 - side] -= shielded
+            energy[side] -= np.where(throwing, charged_cost[side][move], 0)
+
+            chances, changes = buff_tables[side]
+            procs = throwing & (rng.random(trials) < chances[move])
+            for target, stat in np.ndindex(2, 2):
+                affected = side if target == 0 else 1 - side
+                stages[affected, stat] = np.where(procs, np.clip(stages[affected, stat] + changes[move, target, stat],
+                                                                 0, MAX_STAGE - MIN_STAGE), stages[affected, stat])
+
+        finished = running & ((hp[0] <= 0) | (hp[1] <= 0))
+        end_turn[finished] = turn
+        running &= ~finished
+
+        # skip to the next turn where something happens in any trial
+        if running.any():
+            turn = int(np.where(land >= 0, land, ready)[:, running].min())
+
+    hp = np.maximum(hp, 0)
+    hp_share = hp / np.array(battle.hp)[:, np.newaxis]
+
+    outcomes = np.zeros(trials, dtype=SCENARIO_DTYPE)
+    outcomes["winner"] = np.where(hp_share[0] > hp_share[1], 0, np.where(hp_share[1] > hp_share[0], 1, -1))
+    outcomes["hp_1"] = hp[0]
+    outcomes["hp_2"] = hp[1]
+    outcomes["turns"] = np.minimum(end_turn + 1, battle.max_turns)
+    outcomes["rating"] = np.round(500 * (battle.hp[1] - hp[1]) / battle.hp[1] + 500 * hp[0] / battle.hp[0])
+
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    wins = int((outcomes["winner"] == 0).sum())
+    ratings = outcomes["rating"].astype(np.float64)
+    rating = float(ratings.mean())
+    rating_margin = z * float(ratings.std(ddof=1)) / trials ** 0.5 if trials > 1 else 0.0
+
+    return {
+        "trials": outcomes,
+        "win_probability": wins / trials,
+        "win_interval": _get_interval(wins, trials, z),
+        "tie_probability": float((outcomes["winner"] == -1).mean()),
+        "rating": rating,
+        "rating_interval": (rating - rating_margin, rating + rating_margin)
+    }
@@ -1,9 +1,24 @@
-import json
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     from pokemon import Type
 
+# the stat stage changes a move's buffs can make, in the order the snapshot stores them
+BUFF_STAGE_CHANGES = (
+    "attackerAttackStatStageChange",
+    "attackerDefenseStatStageChange",
+    "targetAttackStatStageChange",
+    "targetDefenseStatStageChange",
+)
+
+# a move's raid and gym stats, in the order the snapshot stores them
+PVE_STATS = (
+    "power",
+    "energyDelta",
+    "durationMs",
+    "damageWindowStartMs",
+)
+
 
 class Move:
     """
@@ -25,6 +40,12 @@ class Move:
         The number of turns the move takes.
     usage_type: Literal["fast", "charge"]
         The type of move.
+    buffs: dict
+        The stat stage changes the move can make, keyed like :data:`BUFF_STAGE_CHANGES`, and their
+        ``buffActivationChance``. Empty if the move makes none.
+    pve: dict
+        The move's raid and gym stats, keyed like :data:`PVE_STATS`. ``energyDelta`` is the energy gained
+        by a fast move and spent by a charged move. Empty if the game data has none.
     """
     def __init__(self, **kwargs):
         self.name: str = kwargs.get("name")
@@ -34,6 +55,8 @@ class Move:
         self.energy: int = int(kwargs.get("energy"))
         self.turns: int = int(kwargs.get("turns"))
         self.usage_type: str = kwargs.get("usage_type")
+        self.buffs: dict = dict(kwargs.get("buffs") or {})
+        self.pve: dict = dict(kwargs.get("pve") or {})
 
     def __str__(self):
         return f"({self.type}) {self.name} - {self.power}"
@@ -46,7 +69,9 @@ class Move:
             "power": self.power,
             "energy": self.energy,
             "turns": self.turns,
-            "usage_type": self.usage_type
+            "usage_type": self.usage_type,
+            "buffs": self.buffs,
+            "pve": self.pve
         }
 
     @staticmethod
@@ -68,6 +93,35 @@ class Move:
         return " ".join(word.capitalize() for word in raw_move_string.split("_"))
 
 
+    @classmethod
+    def from_dict(cls, move_dict: dict) -> 'Move':
+        """
+        Creates a move object from its game data entry.
+
+        Parameters
+        ----------
+        move_dict : dict
+            The move's entry in the moves JSON file.
+
+        Returns
+        -------
+        Move
+            The move object.
+        """
+        from .pokemon import parse_type_string  # fix circular import
+
+        return cls(
+            name=move_dict.get("displayName"),
+            unique_id=move_dict["uniqueId"],
+            type=parse_type_string(move_dict["type"]),
+            power=move_dict["power"],
+            energy=move_dict["energyDelta"],
+            turns=move_dict["turns"],
+            usage_type=move_dict["usageType"],
+            buffs=move_dict.get("buffs"),
+            pve=move_dict.get("pve")
+        )
+
     @classmethod
     def get_move_by_name(cls, name: str) -> 'Move':
         """
@@ -83,22 +137,6 @@ class Move:
         Move
             The move object. If the move is not found, it will return the STRUGGLE move, instead.
         """
-        from .pokemon import parse_type_string  # fix circular import
-
-        with open("pokemon/game_data/moves.json", "r") as f:
-            moves_json = json.load(f)
-
-        name = name.replace(" ", "_").upper()
-
-        for move_json_key in moves_json:
-            if move_json_key == name or move_json_key == name + "_FAST":
-                return Move(
-                    unique_id=move_json_key,
-                    type=parse_type_string(moves_json[move_json_key]["type"]),
-                    power=moves_json[move_json_key]["power"],
-                    energy=moves_json[move_json_key]["energyDelta"],
-                    turns=moves_json[move_json_key]["turns"],
-                    usage_type=moves_json[move_json_key]["usageType"]
-                )
+        from .registry import get_game_data  # fix circular import
 
-        return cls.get_move_by_name("STRUGGLE")
+        return get_game_data().get_move(name)
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+from itertools import combinations
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from .calculator import calculate_damage_batch
+from .pokemon import get_type_index
+from .sweep import get_type_indices
+
+if TYPE_CHECKING:
+    from pokemon import Pokemon, Move
+
+
+def prune_charged_moves(charged_moves: list[Move]) -> list[Move]:
+    """
+    Drops the charged moves that another charged move of the same type beats.
+
+    A move is beaten when a move of the same type costs no more energy and deals at least as much damage
+    per energy, since it then deals at least as much damage per energy against every target and baits
+    shields at least as cheaply.
+
+    Parameters
+    ----------
+    charged_moves : list[Move]
+        The charged moves.
+
+    Returns
+    -------
+    list[Move]
+        The charged moves left, in their original order.
+    """
+    def is_dominated(index: int, move: Move) -> bool:
+        for other_index, other in enumerate(charged_moves):
+            if other_index == index or other.type != move.type:
+                continue
+
+            # damage per energy compared as cross products, which is exact for integer power and energy
+            other_power, power = other.power * move.energy, move.power * other.energy
+
+            if other.energy <= move.energy and other_power >= power:
+                if other.energy < move.energy or other_power > power or other_index < index:
+                    return True
+
+        return False
+
+    return [move for index, move in enumerate(charged_moves) if not is_dominated(index, move)]
+
+
+def optimize_moveset(pokemon: Pokemon, targets: list[Pokemon], shields: int = 1, top: int | None = None,
+                     fast_moves: list[Move] | None = None, charged_moves: list[Move] | None = None) -> list[dict]:
+    """
+    Ranks every fast move and pair of charged moves of a Pokémon by how quickly they faint a list of targets.
+
+    The damage of every move against every target is calculated in one batch, and every moveset is scored
+    in one pass over those tables. For each target, a moveset baits each of the target's shields with its
+    cheaper charged move, then keeps throwing the charged move that deals the most damage per energy,
+    while its fast move deals damage and gains energy in between. The turns this takes to faint the target
+    are estimated from the fast move's damage and energy per turn, without modelling the target's attacks.
+
+    Parameters
+    ----------
+    pokemon : Pokemon
+        The Pokémon, whose level, IVs, stat stages and shadow status are used.
+    targets : list[Pokemon]
+        The targets to score the movesets against.
+    shields : int
+        The number of shields every target has.
+    top : int | None
+        Only return the best ``top`` movesets. None returns every moveset.
+    fast_moves : list[Move] | None
+        The fast moves to consider. If None, the species' fast move pool is used.
+    charged_moves : list[Move] | None
+        The charged moves to consider. If None, the species' charged move pool is used.
+
+    Returns
+    -------
+    list[dict]
+        One dictionary per moveset, quickest first, with the keys ``fast_move``, ``charged_moves``
+        (one or two charged moves), ``turns_to_ko`` (the average over every target) and ``dpt`` (the
+        average damage per turn once the target's shields are gone). Charged moves beaten by another
+        move, see :func:`prune_charged_moves`, are left out.
+
+    Raises
+    ------
+    ValueError
+        There are no fast moves, charged moves or targets.
+    """
+    if fast_moves is None:
+        fast_moves = pokemon.species.fast_move_pool
+    if charged_moves is None:
+        charged_moves = pokemon.species.charged_move_pool
+
+    charged_moves = prune_charged_moves(charged_moves)
+
+    if not fast_moves or not charged_moves or not targets:
+        raise ValueError("At least one fast move, charged move and target are needed")
+
+    attack = pokemon.get_true_attack()
+    attacker_types = np.array(get_type_indices(pokemon.species.types))
+
+    defense = np.array([target.get_true_defense() for target in targets], dtype=np.float64)
+    defender_types = np.array([get_type_indices(target.species.types) for target in targets])
+    defender_shadow = np.array([target.shadow for target in targets])
+    hp = np.array([target.get_true_hp() for target in targets], dtype=np.float64)
+
+    def get_damage_table(moves: list[Move]) -> np.ndarray:
+        # one row per move, one column per target, every bubble swiped for charged moves
+        return calculate_damage_batch(
+            attack, defense, np.array([[move.power] for move in moves], dtype=np.float64),
+            np.array([[get_type_index(move.type)] for move in moves]), attacker_types, defender_types,
+            pokemon.shadow, defender_shadow
+        )
+
+    fast_damage = get_damage_table(fast_moves)
+    fast_turns = np.array([[max(move.turns, 1)] for move in fast_moves], dtype=np.float64)
+    fast_dpt = fast_damage / fast_turns
+    fast_ept = np.array([[move.energy] for move in fast_moves], dtype=np.float64) / fast_turns
+
+    charged_damage = get_damage_table(charged_moves)
+    charged_cost = np.array([[move.energy] for move in charged_moves], dtype=np.float64)
+    charged_dpe = charged_damage / charged_cost
+
+    # every pair of charged moves, or the only charged move paired with itself
+    pairs = list(combinations(range(len(charged_moves)), 2)) or [(0, 0)]
+    first, second = (np.array(indices) for indices in zip(*pairs))
+
+    # axis 0 is the fast move, axis 1 the pair of charged moves, axis 2 the target
+    bait_cost = np.minimum(charged_cost[first], charged_cost[second])[np.newaxis]
+    best_dpe = np.maximum(charged_dpe[first], charged_dpe[second])[np.newaxis]
+    dpt = fast_dpt[:, np.newaxis] + fast_ept[:, np.newaxis] * best_dpe
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        bait_turns = shields * bait_cost / fast_ept[:, np.newaxis] if shields else np.zeros_like(bait_cost)
+        bait_damage = fast_dpt[:, np.newaxis] * bait_turns + shields
+
+        # a target that faints before its shields are gone only ever takes fast moves
+        turns_to_ko = np.where(bait_damage >= hp, hp / fast_dpt[:, np.newaxis],
+                               bait_turns + (hp - bait_damage) / dpt)
+
+    average_turns = turns_to_ko.mean(axis=-1).ravel()
+    average_dpt = dpt.mean(axis=-1).ravel()
+
+    order = np.argsort(average_turns, kind="stable")[:top]
+
+    return [
+        {
+            "fast_move": fast_moves[index // len(pairs)],
+            "charged_moves": [charged_moves[first[index % len(pairs)]]] + (
+                [charged_moves[second[index % len(pairs)]]] if len(charged_moves) > 1 else []),
+            "turns_to_ko": float(average_turns[index]),
+            "dpt": float(average_dpt[index])
+        }
+        for index in order.tolist()
+    ]
@@ -3,12 +3,28 @@ import json
 import os
 from enum import Enum
 
+import numpy as np
+
 path = os.path.dirname(__file__)
 cp_multipliers_file = path + '/game_data/cp_multipliers.json'
 
 with open(cp_multipliers_file) as f:
     cpms: dict = json.load(f)
 
+# CP_MULTIPLIERS[int(level * 2)] is the CP multiplier of a level, half levels included
+CP_MULTIPLIERS = np.full(int(max(float(level) for level in cpms) * 2) + 1, np.nan)
+for _level, _cp_multiplier in cpms.items():
+    CP_MULTIPLIERS[int(float(_level) * 2)] = float(_cp_multiplier)
+CP_MULTIPLIERS_SQUARED = np.array([cp_multiplier ** 2 for cp_multiplier in CP_MULTIPLIERS.tolist()])
+CP_MULTIPLIERS.flags.writeable = False
+CP_MULTIPLIERS_SQUARED.flags.writeable = False
+
+MIN_LEVEL = min(float(level) for level in cpms)
+MAX_LEVEL = max(float(level) for level in cpms)
+
+_cp_multipliers: list[float] = CP_MULTIPLIERS.tolist()
+_cp_multipliers_squared: list[float] = CP_MULTIPLIERS_SQUARED.tolist()
+
 stat_stages = {
     -4: 4/8,
     -3: 4/7,
@@ -22,6 +38,87 @@ stat_stages = {
 }
 
 
+def get_level_index(level: float) -> int:
+    """
+    Returns the index of a level in :data:`CP_MULTIPLIERS`.
+
+    Parameters
+    ----------
+    level : float
+        The level, from 1.0 to 55.0 in steps of 0.5.
+
+    Returns
+    -------
+    int
+        The index of the level, ``int(level * 2)``.
+
+    Raises
+    ------
+    ValueError
+        The level is not a multiple of 0.5, or is out of range.
+    """
+    index = level * 2
+    if not float(index).is_integer():
+        raise ValueError(f"level must be a multiple of 0.5, not {level}")
+    if not MIN_LEVEL <= level <= MAX_LEVEL:
+        raise ValueError(f"level must be between {MIN_LEVEL} and {MAX_LEVEL}, not {level}")
+    return int(index)
+
+
+def get_cp_multiplier(level: float) -> float:
+    """
+    Returns the CP multiplier of a level.
+
+    Parameters
+    ----------
+    level : float
+        The level, from 1.0 to 55.0 in steps of 0.5.
+
+    Returns
+    -------
+    float
+        The CP multiplier.
+
+    Raises
+    ------
+    ValueError
+        The level is not a multiple of 0.5, or is out of range.
+    """
+    return _cp_multipliers[get_level_index(level)]
+
+
+def get_cp_multipliers(levels: np.ndarray, squared: bool = False) -> np.ndarray:
+    """
+    Vectorized :func:`get_cp_multiplier`.
+
+    Parameters
+    ----------
+    levels : np.ndarray
+        The levels, from 1.0 to 55.0 in steps of 0.5.
+    squared : bool
+        Whether to return the squared CP multipliers used by the CP formula.
+
+    Returns
+    -------
+    np.ndarray
+        The CP multipliers, in the shape of ``levels``.
+
+    Raises
+    ------
+    ValueError
+        A level is not a multiple of 0.5, or is out of range.
+    """
+    levels = np.asarray(levels, dtype=np.float64)
+    indices = levels * 2
+
+    if not np.all(indices == np.floor(indices)):
+        raise ValueError(f"levels must be multiples of 0.5, not {levels[indices != np.floor(indices)].tolist()}")
+    if not np.all((levels >= MIN_LEVEL) & (levels <= MAX_LEVEL)):
+        raise ValueError(f"levels must be between {MIN_LEVEL} and {MAX_LEVEL}")
+
+    return (CP_MULTIPLIERS_SQUARED if squared else CP_MULTIPLIERS)[indices.astype(np.intp)]
+
+
 class Species:
     def __init__(self, **kwargs):
         """
@@ -72,58 +169,60 @@ class Species:
         }
 
     @classmethod
-    def get_pokemon_species_by_name(cls, name: str, pokemon_species_dict: dict | None = None) -> 'Species':
+    def from_dict(cls, pokemon_dict: dict, get_move) -> 'Species':
         """
-        Returns the Pokémon species object by name.
+        Creates a Pokémon species object from its game data entry.
 
-        :param pokemon_species_dict: List of Pokémon species dictionary
-                                     If None, it will load the default list from the game_data folder.
-        :param name: The name of the Pokémon species to retrieve.
+        :param pokemon_dict: The Pokémon's entry in the Pokémon JSON file.
+        :param get_move: A callable that resolves a move ID from the move pools to a Move object.
         :return: The Pokémon species object.
         """
-        from .moves import Move  # resolve circular import
-
-        if pokemon_species_dict is None:
-            with open("pokemon/game_data/pokemon.json", "r") as f:
-                pokemon_species_dict = json.load(f)
-
-        name = cls.re_parse_pokemon_string(name)
-
-        pokemon_dict = pokemon_species_dict.get(name, pokemon_species_dict.get("UNOWN"))
-
-        pokemon_name = cls.parse_pokemon_string(pokemon_dict["name"])
-        species_name = pokemon_dict["species"]
-
         types = []
         for raw_type_string in pokemon_dict["types"]:
             if raw_type_string:
-
                 types.append(parse_type_string(raw_type_string))
 
-        base_attack = pokemon_dict["base_attack"]
-        base_defense = pokemon_dict["base_defense"]
-        base_hp = pokemon_dict["base_hp"]
-
         fast_move_pool = []
         for raw_move_string in pokemon_dict["fast_move_pool"]:
-            fast_move_pool.append(Move.get_move_by_name(raw_move_string))
+            fast_move_pool.append(get_move(raw_move_string))
 
         charged_move_pool = []
         for raw_move_string in pokemon_dict["charged_move_pool"]:
-            charged_move_pool.append(Move.get_move_by_name(raw_move_string))
+            charged_move_pool.append(get_move(raw_move_string))
 
-        species = cls(
-            name=pokemon_name,
-            species=species_name,
+        return cls(
+            name=cls.parse_pokemon_string(pokemon_dict["name"]),
+            species=pokemon_dict["species"],
             types=types,
-            base_attack=base_attack,
-            base_defense=base_defense,
-            base_hp=base_hp,
+            base_attack=pokemon_dict["base_attack"],
+            base_defense=pokemon_dict["base_defense"],
+            base_hp=pokemon_dict["base_hp"],
             fast_move_pool=fast_move_pool,
             charged_move_pool=charged_move_pool
         )
 
-        return species
+    @classmethod
+    def get_pokemon_species_by_name(cls, name: str, pokemon_species_dict: dict | None = None) -> 'Species':
+        """
+        Returns the Pokémon species object by name.
+
+        :param pokemon_species_dict: List of Pokémon species dictionary
+                                     If None, it will use the shared game data.
+        :param name: The name of the Pokémon species to retrieve.
+        :return: The Pokémon species object.
+        """
+        from .registry import get_game_data  # resolve circular import
+
+        game_data = get_game_data()
+
+        if pokemon_species_dict is None:
+            return game_data.get_species(name)
+
+        name = cls.re_parse_pokemon_string(name)
+
+        pokemon_dict = pokemon_species_dict.get(name, pokemon_species_dict.get("UNOWN"))
+
+        return cls.from_dict(pokemon_dict, game_data.get_move)
 
     @staticmethod
     def parse_pokemon_string(raw_pokemon_string: str) -> str:
@@ -217,14 +316,14 @@ class Pokemon:
         return self.get_true_hp()
 
     def get_cp_multiplier(self) -> float:
-        return float(cpms[str(self.level)])
+        return _cp_multipliers[get_level_index(self.level)]
 
     def get_cp(self):
         return int(
             (self.species.base_attack + self.attack_iv)
             * sqrt(self.species.base_defense + self.defense_iv)
             * sqrt(self.species.base_hp + self.hp_iv)
-            * self.get_cp_multiplier() ** 2
+            * _cp_multipliers_squared[get_level_index(self.level)]
             / 10
         )
 
@@ -336,6 +435,102 @@ def list_types():
     return [_.value for _ in Type]
 
 
+def get_type_index(type: Type) -> int:
+    """
+    Returns the ordinal of a type, used to index :data:`TYPE_CHART` and :data:`DUAL_TYPE_CHART`.
+
+    Parameters
+    ----------
+    type : Type
+        The type.
+
+    Returns
+    -------
+    int
+        The ordinal of the type, from 0 to 17.
+    """
+    return TYPE_INDICES[type]
+
+
+def get_defender_index(defender_types: list[Type]) -> int:
+    """
+    Returns the column of :data:`DUAL_TYPE_CHART` for a defender's types.
+
+    Parameters
+    ----------
+    defender_types : list[Type]
+        The types of the defending Pokémon. Must contain one or two distinct types.
+
+    Returns
+    -------
+    int
+        The column of :data:`DUAL_TYPE_CHART`.
+    """
+    first_type = TYPE_INDICES[defender_types[0]]
+    second_type = TYPE_INDICES[defender_types[-1]]
+    return int(DEFENDER_INDICES[first_type, second_type])
+
+
+def get_defender_indices(first_types: np.ndarray, second_types: np.ndarray) -> np.ndarray:
+    """
+    Returns the columns of :data:`DUAL_TYPE_CHART` for arrays of defender types.
+
+    Parameters
+    ----------
+    first_types : np.ndarray
+        The ordinals of the defenders' first types.
+    second_types : np.ndarray
+        The ordinals of the defenders' second types. Use -1 for single-type defenders.
+
+    Returns
+    -------
+    np.ndarray
+        The columns of :data:`DUAL_TYPE_CHART`.
+    """
+    first_types = np.asarray(first_types, dtype=np.intp)
+    second_types = np.asarray(second_types, dtype=np.intp)
+    second_types = np.where(second_types < 0, first_types, second_types)
+    return DEFENDER_INDICES[first_types, second_types]
+
+
+def _compile_type_charts() -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    with open(path + '/game_data/type_chart.json', "r") as f:
+        type_chart_json = json.load(f)
+
+    type_chart = np.ones((len(Type), len(Type)), dtype=np.float64)
+    for attacker_type in Type:
+        for defender_type in Type:
+            effectiveness_string = type_chart_json[attacker_type.value].get(defender_type.value, "NEUTRAL")
+            type_chart[TYPE_INDICES[attacker_type], TYPE_INDICES[defender_type]] = multiplier_dict.get(
+                effectiveness_string, 1.0)
+
+    # one column per single type and per unordered pair of types, 18 + 153 = 171 in total
+    defender_indices = np.empty((len(Type), len(Type)), dtype=np.intp)
+    dual_type_chart = []
+    for first_type in range(len(Type)):
+        for second_type in range(first_type, len(Type)):
+            defender_indices[first_type, second_type] = defender_indices[second_type, first_type] = len(
+                dual_type_chart)
+            if first_type == second_type:
+                dual_type_chart.append(type_chart[:, first_type])
+            else:
+                dual_type_chart.append(type_chart[:, first_type] * type_chart[:, second_type])
+
+    type_chart.flags.writeable = False
+    defender_indices.flags.writeable = False
+    dual_type_chart = np.ascontiguousarray(np.stack(dual_type_chart, axis=1))
+    dual_type_chart.flags.writeable = False
+
+    return type_chart, dual_type_chart, defender_indices
+
+
+TYPE_INDICES = {type: index for index, type in enumerate(Type)}
+
+# TYPE_CHART[attacker, defender] is the multiplier of one attacking type against one defending type,
+# DUAL_TYPE_CHART[attacker, get_defender_index(types)] against every combination of defending types
+TYPE_CHART, DUAL_TYPE_CHART, DEFENDER_INDICES = _compile_type_charts()
+
+
 def get_type_multiplier(attacker_type: Type, defender_types: list[Type]) -> float:
     """
     Calculates the type effectiveness multiplier for an attack based on the attacker's type and the defender's types.
@@ -352,22 +547,37 @@ def get_type_multiplier(attacker_type: Type, defender_types: list[Type]) -> floa
     float
         The type effectiveness multiplier.
     """
-
-    path = os.path.dirname(__file__)
-    type_chart_file = path + '/game_data/type_chart.json'
-
-    with open(type_chart_file, "r") as f:
-        type_chart = json.load(f)
+    if len(defender_types) == 1 or (len(defender_types) == 2 and defender_types[0] != defender_types[1]):
+        return float(DUAL_TYPE_CHART[TYPE_INDICES[attacker_type], get_defender_index(defender_types)])
 
     multiplier = 1.0
 
     for defender_type in defender_types:
-        effectiveness_string = type_chart.get(attacker_type.value).get(defender_type.value, "NEUTRAL")
-        multiplier *= multiplier_dict.get(effectiveness_string, 1.0)
+        multiplier *= float(TYPE_CHART[TYPE_INDICES[attacker_type], TYPE_INDICES[defender_type]])
 
     return multiplier
 
 
+def get_type_multipliers(attacker_types: np.ndarray, defender_indices: np.ndarray) -> np.ndarray:
+    """
+    Vectorized :func:`get_type_multiplier`.
+
+    Parameters
+    ----------
+    attacker_types : np.ndarray
+        The ordinals of the moves' types, see :func:`get_type_index`.
+    defender_indices : np.ndarray
+        The defenders' columns of :data:`DUAL_TYPE_CHART`, see :func:`get_defender_indices`.
+        Broadcast against ``attacker_types``.
+
+    Returns
+    -------
+    np.ndarray
+        The type effectiveness multipliers.
+    """
+    return DUAL_TYPE_CHART[np.asarray(attacker_types, dtype=np.intp), np.asarray(defender_indices, dtype=np.intp)]
+
+
 def parse_type_string(raw_type_string: str) -> Type:
     """
     Parses a type string and returns the Type object.
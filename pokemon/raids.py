@@ -0,0 +1,312 @@
+from __future__ import annotations
+
+from functools import cache, lru_cache
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from .megas import get_boosted_mask, get_type_mask
+from .pokemon import Type, get_cp_multiplier, get_defender_indices, get_type_index, get_type_multipliers
+from .sweep import get_type_indices
+
+if TYPE_CHECKING:
+    from pokemon import Species, Move
+
+# the CP multiplier and HP of a raid boss, by raid tier
+RAID_BOSS_TIERS = {
+    1: (0.5974, 600),
+    3: (0.73, 3600),
+    4: (0.79, 9000),  # Mega raids
+    5: (0.79, 15000),
+    6: (0.79, 22500),  # Legendary Mega raids
+}
+
+# the types every weather boosts
+WEATHER_BOOSTS = {
+    "sunny": (Type.FIRE, Type.GRASS, Type.GROUND),
+    "rainy": (Type.WATER, Type.ELECTRIC, Type.BUG),
+    "partly_cloudy": (Type.NORMAL, Type.ROCK),
+    "cloudy": (Type.FAIRY, Type.FIGHTING, Type.POISON),
+    "windy": (Type.DRAGON, Type.FLYING, Type.PSYCHIC),
+    "snow": (Type.ICE, Type.STEEL),
+    "fog": (Type.DARK, Type.GHOST)
+}
+
+# by friendship level: none, good, great, ultra and best friends
+FRIENDSHIP_MULTIPLIERS = (1.0, 1.03, 1.05, 1.07, 1.1)
+
+PVE_STAB_MULTIPLIER = 1.2
+WEATHER_MULTIPLIER = 1.2
+MEGA_MULTIPLIER = 1.1
+MEGA_SAME_TYPE_MULTIPLIER = 1.3
+
+# a boss deals about this much damage per second, divided by the attacker's defense, whatever its moves
+BOSS_DAMAGE_ESTIMATE = 900.0
+
+# moves the game data has no raid stats for fall back to their trainer battle stats, a rough estimate
+ESTIMATED_TURN_MS = 500
+ESTIMATED_CHARGED_MOVE_MS = 2000
+
+RAID_DTYPE = np.dtype([
+    ("species", "<u2"),  # index into GameData.species
+    ("fast_move", "<u2"),  # index into GameData.moves
+    ("charged_move", "<u2"),  # index into GameData.moves
+    ("dps", "<f8"),
+    ("tdo", "<f8"),
+    ("time_to_win", "<f8"),
+    ("estimated", "?"),  # whether either move's raid stats are estimated
+])
+
+
+def get_pve_stats(move: Move) -> tuple[float, float, float, bool]:
+    """
+    Returns a move's raid and gym stats.
+
+    Parameters
+    ----------
+    move : Move
+        The move.
+
+    Returns
+    -------
+    tuple[float, float, float, bool]
+        The move's power, energy gained (fast moves) or spent (charged moves), duration in seconds and whether
+        those are estimated from its trainer battle stats, because the game data has no raid stats for it.
+    """
+    if move.pve:
+        return (float(move.pve.get("power", 0)), float(move.pve.get("energyDelta", 0)),
+                move.pve.get("durationMs", 0) / 1000, False)
+
+    if move.usage_type == "charge":
+        duration = ESTIMATED_CHARGED_MOVE_MS
+    else:
+        duration = max(move.turns, 1) * ESTIMATED_TURN_MS
+
+    return float(move.power), float(move.energy), duration / 1000, True
+
+
+class RaidTable:
+    """
+    Every Pokémon form with base stats paired with every fast and charged move combination in its move pools.
+
+    Attributes
+    ----------
+    species, fast_move, charged_move: np.ndarray
+        The index of every row's species into :attr:`.GameData.species` and of its moves into
+        :attr:`.GameData.moves`.
+    base_attack, base_defense, base_hp: np.ndarray
+        The base stats of every row's species.
+    types: np.ndarray
+        The type ordinals of every row's species, with a trailing axis of length 2. -1 means no second type.
+    power, energy, duration, move_type: np.ndarray
+        The raid power, energy, duration in seconds and type ordinal of every move, indexed like
+        :attr:`.GameData.moves`. Energy is gained by fast moves and spent by charged moves.
+    estimated: np.ndarray
+        Whether every move's raid stats are estimated, see :func:`get_pve_stats`.
+    """
+
+    def __init__(self, species_list: list[Species], moves: list[Move]):
+        move_indices = {move.unique_id: index for index, move in enumerate(moves)}
+
+        rows = [
+            (species_index, move_indices[fast_move.unique_id], move_indices[charged_move.unique_id])
+            for species_index, species in enumerate(species_list)
+            if species.base_attack is not None and species.base_defense is not None and species.base_hp is not None
+            for fast_move in species.fast_move_pool
+            for charged_move in species.charged_move_pool
+        ]
+        self.species, self.fast_move, self.charged_move = np.array(rows, dtype=np.intp).reshape(-1, 3).T
+
+        species_list = [species_list[index] for index in self.species.tolist()]
+        self.base_attack = np.array([species.base_attack for species in species_list], dtype=np.float64)
+        self.base_defense = np.array([species.base_defense for species in species_list], dtype=np.float64)
+        self.base_hp = np.array([species.base_hp for species in species_list], dtype=np.float64)
+        self.types = np.array([get_type_indices(species.types) for species in species_list],
+                              dtype=np.intp).reshape(-1, 2)
+
+        self.power, self.energy, self.duration, self.estimated = (
+            np.array(column) for column in zip(*[get_pve_stats(move) for move in moves]))
+        self.move_type = np.array([get_type_index(move.type) for move in moves], dtype=np.intp)
+
+    def __len__(self):
+        return len(self.species)
+
+
+@cache
+def get_raid_table() -> RaidTable:
+    """
+    Returns the raid table of the shared game data, building it on the first call.
+
+    Returns
+    -------
+    RaidTable
+        The shared raid table.
+    """
+    from .registry import get_game_data  # resolve circular import
+
+    game_data = get_game_data()
+
+    return RaidTable(list(game_data.species), list(game_data.moves))
+
+
+def _get_multipliers(table: RaidTable, move: np.ndarray, boss_types: np.ndarray, weather_mask: int,
+                     friendship: int, mega_mask: int | None) -> np.ndarray:
+    move_type = table.move_type[move]
+    move_mask = np.left_shift(1, move_type)
+
+    is_stab = (move_type == table.types[:, 0]) | (move_type == table.types[:, 1])
+    multipliers = np.where(is_stab, PVE_STAB_MULTIPLIER, 1.0) * FRIENDSHIP_MULTIPLIERS[friendship]
+    multipliers *= np.where(move_mask & weather_mask, WEATHER_MULTIPLIER, 1.0)
+
+    if mega_mask is not None:
+        multipliers *= np.where(move_mask & mega_mask, MEGA_SAME_TYPE_MULTIPLIER, MEGA_MULTIPLIER)
+
+    return multipliers * get_type_multipliers(move_type, get_defender_indices(boss_types[0], boss_types[1]))
+
+
+@lru_cache(maxsize=64)
+def _rank_raid_table(boss: Species, tier: int, weather: str | None, friendship: int, mega: Species | None,
+                     level: float, attack_iv: int, defense_iv: int, hp_iv: int, trainers: int) -> np.ndarray:
+    table = get_raid_table()
+
+    boss_cp_multiplier, boss_hp = RAID_BOSS_TIERS[tier]
+    boss_defense = (boss.base_defense + 15) * boss_cp_multiplier
+    boss_types = np.array(get_type_indices(boss.types))
+
+    weather_mask = get_type_mask(WEATHER_BOOSTS[weather]) if weather else 0
+    mega_mask = get_boosted_mask(mega) if mega is not None else None
+
+    cp_multiplier = get_cp_multiplier(level)
+    attack = (table.base_attack + attack_iv) * cp_multiplier
+    defense = (table.base_defense + defense_iv) * cp_multiplier
+    hp = np.maximum(((table.base_hp + hp_iv) * cp_multiplier).astype(np.int64), 10)
+
+    def get_damage(move: np.ndarray) -> np.ndarray:
+        multipliers = _get_multipliers(table, move, boss_types, weather_mask, friendship, mega_mask)
+        return np.floor(0.5 * table.power[move] * attack / boss_defense * multipliers) + 1
+
+    fast_damage, charged_damage = get_damage(table.fast_move), get_damage(table.charged_move)
+
+    # every cycle uses the fast move until the charged move is affordable, then the charged move
+    fast_energy = np.maximum(table.energy[table.fast_move], 1.0)
+    fast_moves = table.energy[table.charged_move] / fast_energy
+    cycle_duration = fast_moves * table.duration[table.fast_move] + table.duration[table.charged_move]
+    dps = (fast_moves * fast_damage + charged_damage) / cycle_duration
+
+    # the attacker faints after taking its HP in boss damage
+    survival = hp / (BOSS_DAMAGE_ESTIMATE / defense)
+
+    ranking = np.zeros(len(table), dtype=RAID_DTYPE)
+    ranking["species"] = table.species
+    ranking["fast_move"] = table.fast_move
+    ranking["charged_move"] = table.charged_move
+    ranking["dps"] = dps
+    ranking["tdo"] = dps * survival
+    ranking["time_to_win"] = boss_hp / (dps * trainers)
+    ranking["estimated"] = table.estimated[table.fast_move] | table.estimated[table.charged_move]
+
+    # highest damage per second first, ties keep game data order
+    ranking = ranking[np.argsort(-dps, kind="stable")]
+    ranking.flags.writeable = False
+
+    return ranking
+
+
+def calculate_raid_table(boss: Species, tier: int = 5, weather: str | None = None, friendship: int = 0,
+                         mega: Species | None = None, level: float = 40.0, attack_iv: int = 15, defense_iv: int = 15,
+                         hp_iv: int = 15, trainers: int = 1) -> np.ndarray:
+    """
+    Calculates the raid damage of every Pokémon form with every fast and charged move combination against a boss.
+
+    Every combination is calculated at once with the raid damage formula. A combination uses its fast move
+    until its charged move is affordable, then its charged move, and takes an estimated amount of damage from
+    the boss per second, so neither dodging nor energy gained from damage taken are modelled. Results are
+    cached by their arguments, so repeated calls against the same boss and weather are instant.
+
+    Parameters
+    ----------
+    boss : Species
+        The raid boss.
+    tier : int
+        The raid tier, see :data:`RAID_BOSS_TIERS`.
+    weather : str | None
+        The weather, see :data:`WEATHER_BOOSTS`, or None for no weather boost.
+    friendship : int
+        The friendship level with the other trainers, from 0 (none) to 4 (best friends).
+    mega : Species | None
+        The Mega Evolution/Primal Reversion active in the raid, if any. It boosts every attack, more so
+        attacks of its boosted types, see :func:`.get_boosted_mask`.
+    level : float
+        The attackers' level.
+    attack_iv : int
+        The attackers' attack IV.
+    defense_iv : int
+        The attackers' defense IV.
+    hp_iv : int
+        The attackers' HP IV.
+    trainers : int
+        The number of trainers in the raid, all using the same attackers.
+
+    Returns
+    -------
+    np.ndarray
+        A read-only structured array of :data:`RAID_DTYPE`, one row per combination, highest ``dps`` first.
+        ``tdo`` is the total damage an attacker deals before fainting, and ``time_to_win`` the seconds the
+        trainers take to defeat the boss, ignoring the time spent switching attackers.
+
+    Raises
+    ------
+    ValueError
+        An argument is out of range, or the boss has no base stats.
+    """
+    if tier not in RAID_BOSS_TIERS:
+        raise ValueError(f"Unknown raid tier: {tier}")
+    if weather is not None and weather not in WEATHER_BOOSTS:
+        raise ValueError(f"Unknown weather: {weather}")
+    if not 0 <= friendship < len(FRIENDSHIP_MULTIPLIERS):
+        raise ValueError(f"Friendship must be between 0 and {len(FRIENDSHIP_MULTIPLIERS) - 1}")
+    if trainers < 1:
+        raise ValueError("At least one trainer is needed")
+    if boss.base_defense is None:
+        raise ValueError(f"{boss.name} has no base stats")
+
+    return _rank_raid_table(boss, tier, weather, friendship, mega, float(level), attack_iv, defense_iv, hp_iv,
+                            trainers)
+
+
+def rank_raid_attackers(boss: Species, top: int | None = 10, **kwargs) -> list[dict]:
+    """
+    Ranks the best raid attackers against a boss, see :func:`calculate_raid_table`.
+
+    Parameters
+    ----------
+    boss : Species
+        The raid boss.
+    top : int | None
+        Only return the best ``top`` attackers. None returns every combination.
+    **kwargs
+        The other arguments of :func:`calculate_raid_table`.
+
+    Returns
+    -------
+    list[dict]
+        One dictionary per combination, highest damage per second first, with the keys ``species``,
+        ``fast_move``, ``charged_move``, ``dps``, ``tdo``, ``time_to_win`` and ``estimated``.
+    """
+    from .registry import get_game_data  # resolve circular import
+
+    game_data = get_game_data()
+
+    return [
+        {
+            "species": game_data.species[species],
+            "fast_move": game_data.moves[fast_move],
+            "charged_move": game_data.moves[charged_move],
+            "dps": dps,
+            "tdo": tdo,
+            "time_to_win": time_to_win,
+            "estimated": estimated
+        }
+        for species, fast_move, charged_move, dps, tdo, time_to_win, estimated
+        in calculate_raid_table(boss, **kwargs)[:top].tolist()
+    ]
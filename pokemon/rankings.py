@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import os
+from functools import cache
+
+import numpy as np
+
+from .calculator import SHADOW_ATTACK_MULTIPLIER, SHADOW_DEFENSE_MULTIPLIER
+from .pokemon import CP_MULTIPLIERS, CP_MULTIPLIERS_SQUARED, Species, get_level_index
+
+path = os.path.dirname(__file__)
+rankings_directory = path + '/game_data/rankings'
+
+GREAT_LEAGUE = 1500
+ULTRA_LEAGUE = 2500
+MASTER_LEAGUE = None
+
+RANKING_DTYPE = np.dtype([
+    ("attack_iv", "u1"),
+    ("defense_iv", "u1"),
+    ("hp_iv", "u1"),
+    ("level", "<f4"),
+    ("cp", "<u4"),
+    ("attack", "<f8"),
+    ("defense", "<f8"),
+    ("hp", "<u2"),
+    ("stat_product", "<f8"),
+])
+
+# the on-disk cache, spread is attack_iv * 256 + defense_iv * 16 + hp_iv
+CACHED_RANKING_DTYPE = np.dtype([
+    ("spread", "<u2"),
+    ("level_index", "u1"),
+])
+
+# every IV spread, attack IV major: (0, 0, 0), (0, 0, 1), ..., (15, 15, 15)
+_ATTACK_IVS, _DEFENSE_IVS, _HP_IVS = (ivs.ravel() for ivs in np.meshgrid(np.arange(16), np.arange(16), np.arange(16),
+                                                                         indexing="ij"))
+
+
+def rank_iv_spreads(species: Species, cp_cap: int | None = GREAT_LEAGUE, level_cap: float = 50.0,
+                    shadow: bool = False) -> np.ndarray:
+    """
+    Ranks every IV spread of a species by stat product under a CP cap.
+
+    Each spread is raised to the highest level, up to the level cap, at which it stays within the CP cap.
+
+    Parameters
+    ----------
+    species : Species
+        The species.
+    cp_cap : int | None
+        The league's CP cap, e.g. :data:`GREAT_LEAGUE`. None for no cap.
+    level_cap : float
+        The highest level allowed, e.g. 40.0, 50.0 or 51.0.
+    shadow : bool
+        Whether to rank the Shadow Pokémon, whose attack and defense are multiplied by 6/5 and 5/6.
+
+    Returns
+    -------
+    np.ndarray
+        A structured array of :data:`RANKING_DTYPE`, best stat product first. Spreads that exceed the
+        CP cap even at level 1 are left out.
+
+    Raises
+    ------
+    ValueError
+        The species has no base stats, or the level cap is not a valid level.
+    """
+    if species.base_attack is None or species.base_defense is None or species.base_hp is None:
+        raise ValueError(f"{species.name} has no base stats")
+
+    level_indices = np.arange(get_level_index(1.0), get_level_index(level_cap) + 1)
+
+    attack_base = species.base_attack + _ATTACK_IVS
+    defense_base = species.base_defense + _DEFENSE_IVS
+    hp_base = species.base_hp + _HP_IVS
+
+    # same operation order as Pokemon.get_cp
+    cp_base = attack_base * np.sqrt(defense_base) * np.sqrt(hp_base)
+    cp_grid = (cp_base[:, np.newaxis] * CP_MULTIPLIERS_SQUARED[level_indices] / 10).astype(np.int64)
+
+    if cp_cap is None:
+        legal_levels = np.full(len(cp_base), len(level_indices))
+    else:
+        # CP never goes down with level, so the number of legal levels points at the highest one
+        legal_levels = np.count_nonzero(cp_grid <= cp_cap, axis=1)
+
+    spreads = np.flatnonzero(legal_levels)
+    rankings = _build_rankings(species, spreads, level_indices[legal_levels[spreads] - 1], shadow)
+
+    # best first, ties keep IV order
+    return rankings[np.argsort(-rankings["stat_product"], kind="stable")]
+
+
+def _build_rankings(species: Species, spreads: np.ndarray, level_indices: np.ndarray, shadow: bool) -> np.ndarray:
+    cp_multipliers = CP_MULTIPLIERS[level_indices]
+
+    attack_base = species.base_attack + _ATTACK_IVS[spreads]
+    defense_base = species.base_defense + _DEFENSE_IVS[spreads]
+    hp_base = species.base_hp + _HP_IVS[spreads]
+
+    attack = attack_base * cp_multipliers
+    defense = defense_base * cp_multipliers
+    hp = np.maximum((hp_base * cp_multipliers).astype(np.int64), 10)
+
+    if shadow:
+        attack = attack * SHADOW_ATTACK_MULTIPLIER
+        defense = defense * SHADOW_DEFENSE_MULTIPLIER
+
+    rankings = np.empty(len(spreads), dtype=RANKING_DTYPE)
+    rankings["attack_iv"] = _ATTACK_IVS[spreads]
+    rankings["defense_iv"] = _DEFENSE_IVS[spreads]
+    rankings["hp_iv"] = _HP_IVS[spreads]
+    rankings["level"] = level_indices / 2
+    rankings["cp"] = (attack_base * np.sqrt(defense_base) * np.sqrt(hp_base) * CP_MULTIPLIERS_SQUARED[level_indices]
+                      / 10).astype(np.int64)
+    rankings["attack"] = attack
+    rankings["defense"] = defense
+    rankings["hp"] = hp
+    rankings["stat_product"] = attack * defense * hp
+
+    return rankings
+
+
+@cache
+def _get_game_data_version() -> str:
+    from .snapshot import get_source_digest  # resolve circular import
+
+    return get_source_digest().hex()
+
+
+def _get_rankings_path(directory: str, species: Species, cp_cap: int | None, level_cap: float, shadow: bool) -> str:
+    version = _get_game_data_version()
+    league = "none" if cp_cap is None else str(cp_cap)
+    variant = "shadow" if shadow else "normal"
+    file_name = f"{Species.re_parse_pokemon_string(species.name)}_{league}_{level_cap:g}_{variant}.npy"
+
+    return os.path.join(directory, version, file_name)
+
+
+def get_iv_rankings(species: Species, cp_cap: int | None = GREAT_LEAGUE, level_cap: float = 50.0,
+                    shadow: bool = False, top: int | None = None, directory: str = rankings_directory) -> np.ndarray:
+    """
+    Returns the IV rankings of a species, reading them from the on-disk cache when possible.
+
+    Rankings are cached per version of the game data, so updating the game data never serves stale rankings.
+
+    Parameters
+    ----------
+    species : Species
+        The species.
+    cp_cap : int | None
+        The league's CP cap, e.g. :data:`GREAT_LEAGUE`. None for no cap.
+    level_cap : float
+        The highest level allowed, e.g. 40.0, 50.0 or 51.0.
+    shadow : bool
+        Whether to rank the Shadow Pokémon.
+    top : int | None
+        Only return the best ``top`` spreads. None returns every spread.
+    directory : str
+        The directory the rankings are cached in.
+
+    Returns
+    -------
+    np.ndarray
+        A structured array of :data:`RANKING_DTYPE`, best stat product first.
+    """
+    rankings_path = _get_rankings_path(directory, species, cp_cap, level_cap, shadow)
+
+    try:
+        ranked_spreads = np.load(rankings_path, mmap_mode="r")
+    except (OSError, ValueError):
+        rankings = rank_iv_spreads(species, cp_cap, level_cap, shadow)
+
+        # only the order and levels are stored, the stats of the rows read back are cheap to rebuild
+        ranked_spreads = np.empty(len(rankings), dtype=CACHED_RANKING_DTYPE)
+        ranked_spreads["spread"] = rankings["attack_iv"].astype(np.uint16) * 256 + rankings["defense_iv"].astype(
+            np.uint16) * 16 + rankings["hp_iv"]
+        ranked_spreads["level_index"] = rankings["level"] * 2
+
+        try:
+            os.makedirs(os.path.dirname(rankings_path), exist_ok=True)
+            temporary_path = f"{rankings_path}.{os.getpid()}.tmp.npy"
+            np.save(temporary_path, ranked_spreads)
+            os.replace(temporary_path, rankings_path)
+        except OSError:
+            pass  # the cache is optional, e.g. on a read-only install
+
+        return rankings[:top]
+
+    ranked_spreads = ranked_spreads[:top]
+
+    return _build_rankings(species, ranked_spreads["spread"].astype(np.intp),
+                           ranked_spreads["level_index"].astype(np.intp), shadow)
+
+
+def cache_all_iv_rankings(cp_cap: int | None = GREAT_LEAGUE, level_cap: float = 50.0, shadow: bool = False,
+                          directory: str = rankings_directory) -> int:
+    """
+    Ranks and caches the IV spreads of every species with base stats.
+
+    Parameters
+    ----------
+    cp_cap : int | None
+        The league's CP cap, e.g. :data:`GREAT_LEAGUE`. None for no cap.
+    level_cap : float
+        The highest level allowed, e.g. 40.0, 50.0 or 51.0.
+    shadow : bool
+        Whether to rank the Shadow Pokémon.
+    directory : str
+        The directory the rankings are cached in.
+
+    Returns
+    -------
+    int
+        The number of species ranked.
+    """
+    from .registry import get_game_data  # resolve circular import
+
+    count = 0
+
+    for species in get_game_data().species:
+        if species.base_attack is None or species.base_defense is None or species.base_hp is None:
+            continue
+
+        get_iv_rankings(species, cp_cap, level_cap, shadow, top=0, directory=directory)
+        count += 1
+
+    return count
@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+import json
+import os
+from functools import cache, cached_property
+from types import MappingProxyType
+from typing import Mapping
+
+from .moves import Move
+from .pokemon import Species
+
+path = os.path.dirname(__file__)
+moves_file = path + '/game_data/moves.json'
+pokemon_file = path + '/game_data/pokemon.json'
+
+
+class GameData:
+    """
+    An immutable, indexed view of the game data.
+
+    Every move and species is built exactly once and shared between all lookups, so a
+    species' move pool holds the same :class:`.Move` objects as :attr:`moves_by_id`.
+    Use :func:`get_game_data` to get the process-wide instance.
+
+    Attributes
+    ----------
+    moves_by_id: Mapping[str, :class:`.Move`]
+        Moves indexed by their unique ID, e.g. ``"EMBER"``.
+    species_by_key: Mapping[str, :class:`.Species`]
+        Pokémon indexed by their game data key, e.g. ``"MEGA_CHARIZARD_X"``.
+    species_by_name: Mapping[str, :class:`.Species`]
+        Pokémon indexed by their name, e.g. ``"Mega Charizard X"``.
+    forms: Mapping[str, tuple[str, ...]]
+        The names of every form of a species, indexed by species.
+    source_digest: bytes | None
+        The digest of the JSON files the game data was loaded from, see :func:`.get_source_digest`.
+        None if it is unknown.
+    """
+
+    def __init__(self, moves_by_id: Mapping[str, Move], species_by_key: Mapping[str, Species],
+                 species_by_name: Mapping[str, Species], forms: Mapping[str, tuple[str, ...]],
+                 source_digest: bytes | None = None):
+        object.__setattr__(self, "moves_by_id", _read_only(moves_by_id))
+        object.__setattr__(self, "species_by_key", _read_only(species_by_key))
+        object.__setattr__(self, "species_by_name", _read_only(species_by_name))
+        object.__setattr__(self, "forms", _read_only(forms))
+        object.__setattr__(self, "source_digest", source_digest)
+
+    @classmethod
+    def from_json(cls, moves_json: list | dict, pokemon_json: dict, source_digest: bytes | None = None) -> GameData:
+        """
+        Builds the game data from the parsed moves and Pokémon JSON files.
+
+        Parameters
+        ----------
+        moves_json : list | dict
+            The parsed moves JSON file.
+        pokemon_json : dict
+            The parsed Pokémon JSON file.
+        source_digest : bytes | None
+            The digest of the JSON files, see :func:`.get_source_digest`. None if it is unknown.
+
+        Returns
+        -------
+        GameData
+            The game data.
+        """
+        # older game data is keyed by move ID, newer game data is a plain list
+        if isinstance(moves_json, dict):
+            moves_json = list(moves_json.values())
+
+        moves_by_id = {}
+        for move_dict in moves_json:
+            move = Move.from_dict(move_dict)
+            moves_by_id[move.unique_id] = move
+
+        resolver = cls(moves_by_id, {}, {}, {})
+
+        species_by_key = {}
+        species_by_name = {}
+        forms = {}
+
+        for pokemon_json_key in pokemon_json:
+            species = Species.from_dict(pokemon_json[pokemon_json_key], resolver.get_move)
+
+            species_by_key[pokemon_json_key] = species
+            species_by_name[species.name] = species
+            forms.setdefault(species.species, []).append(species.name)
+
+        return cls(moves_by_id, species_by_key, species_by_name,
+                   {key: tuple(value) for key, value in forms.items()}, source_digest)
+
+    def __setattr__(self, key, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, key):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    @cached_property
+    def moves(self) -> tuple[Move, ...]:
+        """Every move, in game data order."""
+        return tuple(self.moves_by_id.values())
+
+    @cached_property
+    def species(self) -> tuple[Species, ...]:
+        """Every Pokémon form, in game data order."""
+        return tuple(self.species_by_key.values())
+
+    @cached_property
+    def megas(self) -> tuple[Species, ...]:
+        """Every Mega Evolution/Primal Reversion."""
+        return tuple(
+            self.species_by_key[key] for key in self.species_by_key
+            if key.startswith("MEGA_") or key.startswith("PRIMAL_")
+        )
+
+    def find_move(self, name: str) -> Move | None:
+        """
+        Returns a move by its unique ID or name.
+
+        Parameters
+        ----------
+        name : str
+            The unique ID or name of the move, e.g. ``"EMBER_FAST"`` or ``"Ember"``.
+
+        Returns
+        -------
+        Move | None
+            The move object, or None if the move is not found.
+        """
+        name = name.replace(" ", "_").upper()
+
+        move = self.moves_by_id.get(name)
+        if move is None:
+            # move pools reference fast moves as e.g. "EMBER_FAST" or "WATER_GUN_FAST_BLASTOISE"
+            move = self.moves_by_id.get(name.replace("_FAST", ""))
+        if move is None:
+            move = self.moves_by_id.get(name + "_FAST")
+
+        return move
+
+    def get_move(self, name: str) -> Move:
+        """
+        Returns a move by its unique ID or name.
+
+        Parameters
+        ----------
+        name : str
+            The unique ID or name of the move.
+
+        Returns
+        -------
+        Move
+            The move object. If the move is not found, it will return the STRUGGLE move, instead.
+        """
+        return self.find_move(name) or self.moves_by_id["STRUGGLE"]
+
+    def get_species(self, name: str) -> Species:
+        """
+        Returns a Pokémon species by its game data key or name.
+
+        Parameters
+        ----------
+        name : str
+            The game data key or name of the Pokémon, e.g. ``"MEGA_CHARIZARD_X"`` or ``"Mega Charizard X"``.
+
+        Returns
+        -------
+        Species
+            The Pokémon species object. If the Pokémon is not found, it will return UNOWN, instead.
+        """
+        species = self.species_by_name.get(name)
+        if species is None:
+            species = self.species_by_key.get(Species.re_parse_pokemon_string(name))
+        if species is None:
+            species = self.species_by_key["UNOWN"]
+
+        return species
+
+
+def _read_only(mapping: Mapping) -> Mapping:
+    return MappingProxyType(mapping) if isinstance(mapping, dict) else mapping
+
+
+def load_game_data(moves_path: str = moves_file, pokemon_path: str = pokemon_file) -> GameData:
+    """
+    Loads the game data from disk.
+
+    Most callers want :func:`get_game_data` instead, which only loads the game data once.
+
+    Parameters
+    ----------
+    moves_path : str
+        The path to the moves JSON file.
+    pokemon_path : str
+        The path to the Pokémon JSON file.
+
+    Returns
+    -------
+    GameData
+        The loaded game data.
+    """
+    from .snapshot import get_source_digest  # resolve circular import
+
+    # hashed first, so files changed while they are read never get the digest of their new content
+    source_digest = get_source_digest(moves_path, pokemon_path)
+
+    with open(moves_path, "r") as f:
+        moves_json = json.load(f)
+
+    with open(pokemon_path, "r") as f:
+        pokemon_json = json.load(f)
+
+    return GameData.from_json(moves_json, pokemon_json, source_digest)
+
+
+@cache
+def get_game_data() -> GameData:
+    """
+    Returns the process-wide game data, loading it on the first call.
+
+    The game data is read from the compiled snapshot, which is rebuilt first if the JSON files changed.
+
+    Returns
+    -------
+    GameData
+        The shared game data.
+    """
+    from .snapshot import load_compiled_game_data  # resolve circular import
+
+    try:
+        return load_compiled_game_data()
+    except OSError:
+        # the snapshot could not be written, e.g. a read-only install
+        return load_game_data()
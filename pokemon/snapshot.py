@@ -0,0 +1,421 @@
+from __future__ import annotations
+
+import hashlib
+import mmap
+import os
+import struct
+import zlib
+from typing import Callable, Iterator, Mapping
+
+import numpy as np
+
+from .moves import Move, BUFF_STAGE_CHANGES, PVE_STATS
+from .pokemon import Species, Type, TYPE_INDICES
+from .registry import GameData, moves_file, pokemon_file
+
+path = os.path.dirname(__file__)
+snapshot_file = path + '/game_data/game_data.bin'
+
+SNAPSHOT_MAGIC = b"ETCS"
+SNAPSHOT_VERSION = 3
+
+# magic, format version, number of columns, digest of the source JSON files, CRC32 of everything after the header
+HEADER = struct.Struct("<4sHH16sI")
+COLUMN_ENTRY = struct.Struct("<QQ")
+
+COLUMNS = (
+    ("string_offsets", np.dtype("<u4")),
+    ("string_data", np.dtype("u1")),
+    ("move_id", np.dtype("<u4")),
+    ("move_name", np.dtype("<u4")),
+    ("move_usage_type", np.dtype("<u4")),
+    ("move_type", np.dtype("i1")),
+    ("move_power", np.dtype("<f8")),
+    ("move_energy", np.dtype("<i2")),
+    ("move_turns", np.dtype("<i2")),
+    ("move_buff_chance", np.dtype("<f8")),
+    ("move_buff_stages", np.dtype("i1")),  # one row of BUFF_STAGE_CHANGES per move
+    ("move_pve", np.dtype("<f8")),  # one row of PVE_STATS per move, NaN for none
+    ("species_key", np.dtype("<u4")),
+    ("species_name", np.dtype("<u4")),
+    ("species_species", np.dtype("<u4")),
+    ("species_type_1", np.dtype("i1")),
+    ("species_type_2", np.dtype("i1")),
+    ("species_base_attack", np.dtype("<u2")),
+    ("species_base_defense", np.dtype("<u2")),
+    ("species_base_hp", np.dtype("<u2")),
+    ("fast_move_pool_offsets", np.dtype("<u4")),
+    ("fast_move_pool", np.dtype("<u2")),
+    ("charged_move_pool_offsets", np.dtype("<u4")),
+    ("charged_move_pool", np.dtype("<u2")),
+)
+
+TYPES = tuple(Type)
+
+# a few forms have no base stats in the game master, e.g. Aegislash
+MISSING_STAT = 0xFFFF
+
+
+def get_source_digest(moves_path: str = moves_file, pokemon_path: str = pokemon_file) -> bytes:
+    """
+    Returns the digest of the game data JSON files a snapshot is compiled from.
+
+    Parameters
+    ----------
+    moves_path : str
+        The path to the moves JSON file.
+    pokemon_path : str
+        The path to the Pokémon JSON file.
+
+    Returns
+    -------
+    bytes
+        A 16 byte digest.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for source_path in (moves_path, pokemon_path):
+        with open(source_path, "rb") as f:
+            digest.update(f.read())
+        digest.update(b"\0")
+    return digest.digest()
+
+
+def _pack_stat(stat: int | None) -> int:
+    return MISSING_STAT if stat is None else stat
+
+
+def _unpack_stat(stat: np.uint16) -> int | None:
+    return None if stat == MISSING_STAT else int(stat)
+
+
+def compile_snapshot(game_data: GameData, source_digest: bytes) -> bytes:
+    """
+    Compiles game data into a snapshot.
+
+    Parameters
+    ----------
+    game_data : GameData
+        The game data to compile.
+    source_digest : bytes
+        The digest of the JSON files the game data was loaded from, see :func:`get_source_digest`.
+
+    Returns
+    -------
+    bytes
+        The snapshot.
+    """
+    strings: dict[str, int] = {}
+
+    def intern(string: str | None) -> int:
+        return strings.setdefault(string or "", len(strings))
+
+    moves = game_data.moves
+    move_indices = {move.unique_id: index for index, move in enumerate(moves)}
+
+    species_list = game_data.species
+    species_keys = list(game_data.species_by_key)
+
+    columns = {
+        "move_id": [intern(move.unique_id) for move in moves],
+        "move_name": [intern(move.name) for move in moves],
+        "move_usage_type": [intern(move.usage_type) for move in moves],
+        "move_type": [TYPE_INDICES[move.type] for move in moves],
+        "move_power": [move.power for move in moves],
+        "move_energy": [move.energy for move in moves],
+        "move_turns": [move.turns for move in moves],
+        "move_buff_chance": [move.buffs.get("buffActivationChance", 0.0) for move in moves],
+        "move_buff_stages": [move.buffs.get(change, 0) for move in moves for change in BUFF_STAGE_CHANGES],
+        "move_pve": [move.pve.get(stat, np.nan) for move in moves for stat in PVE_STATS],
+        "species_key": [intern(key) for key in species_keys],
+        "species_name": [intern(species.name) for species in species_list],
+        "species_species": [intern(species.species) for species in species_list],
+        "species_type_1": [TYPE_INDICES[species.types[0]] if species.types else -1 for species in species_list],
+        "species_type_2": [TYPE_INDICES[species.types[1]] if len(species.types) > 1 else -1
+                           for species in species_list],
+        "species_base_attack": [_pack_stat(species.base_attack) for species in species_list],
+        "species_base_defense": [_pack_stat(species.base_defense) for species in species_list],
+        "species_base_hp": [_pack_stat(species.base_hp) for species in species_list],
+    }
+
+    for pool in ("fast_move_pool", "charged_move_pool"):
+        offsets = [0]
+        entries = []
+        for species in species_list:
+            entries.extend(move_indices[move.unique_id] for move in getattr(species, pool))
+            offsets.append(len(entries))
+        columns[pool + "_offsets"] = offsets
+        columns[pool] = entries
+
+    encoded_strings = [string.encode("utf-8") for string in strings]
+    columns["string_offsets"] = np.concatenate(([0], np.cumsum([len(string) for string in encoded_strings])))
+    columns["string_data"] = np.frombuffer(b"".join(encoded_strings), dtype=np.uint8)
+
+    column_table = HEADER.size + COLUMN_ENTRY.size * len(COLUMNS)
+    payload = bytearray()
+    entries = bytearray()
+    for name, dtype in COLUMNS:
+        # keep every column 8 byte aligned so it can be viewed without copying
+        payload.extend(b"\0" * (-(column_table + len(payload)) % 8))
+        data = np.asarray(columns[name], dtype=dtype).tobytes()
+        entries.extend(COLUMN_ENTRY.pack(column_table + len(payload), len(data)))
+        payload.extend(data)
+
+    body = bytes(entries) + bytes(payload)
+    header = HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(COLUMNS), source_digest, zlib.crc32(body))
+
+    return header + body
+
+
+def write_snapshot(snapshot_path: str = snapshot_file, moves_path: str = moves_file,
+                   pokemon_path: str = pokemon_file):
+    """
+    Compiles the game data JSON files into a snapshot file.
+
+    Parameters
+    ----------
+    snapshot_path : str
+        The path to write the snapshot to.
+    moves_path : str
+        The path to the moves JSON file.
+    pokemon_path : str
+        The path to the Pokémon JSON file.
+    """
+    from .registry import load_game_data  # resolve circular import
+
+    snapshot = compile_snapshot(load_game_data(moves_path, pokemon_path), get_source_digest(moves_path, pokemon_path))
+
+    # write to a temporary file first so a running process never maps a half-written snapshot
+    temporary_path = f"{snapshot_path}.{os.getpid()}.tmp"
+    with open(temporary_path, "wb") as f:
+        f.write(snapshot)
+    os.replace(temporary_path, snapshot_path)
+
+
+class Snapshot:
+    """
+    A compiled game data snapshot, read through a memory map.
+
+    Moves and species are only built when they are first accessed.
+
+    Raises
+    ------
+    ValueError
+        The snapshot is corrupt, or was written by a different snapshot version.
+    """
+
+    def __init__(self, buffer: mmap.mmap | bytes):
+        if len(buffer) < HEADER.size:
+            raise ValueError("Snapshot is truncated")
+
+        magic, version, column_count, source_digest, checksum = HEADER.unpack_from(buffer)
+
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError("Not a game data snapshot")
+        if version != SNAPSHOT_VERSION or column_count != len(COLUMNS):
+            raise ValueError(f"Unsupported snapshot version: {version}")
+        if zlib.crc32(memoryview(buffer)[HEADER.size:]) != checksum:
+            raise ValueError("Snapshot checksum mismatch")
+
+        self.buffer = buffer
+        self.source_digest: bytes = source_digest
+
+        for index, (name, dtype) in enumerate(COLUMNS):
+            offset, size = COLUMN_ENTRY.unpack_from(buffer, HEADER.size + index * COLUMN_ENTRY.size)
+            setattr(self, name, np.frombuffer(buffer, dtype=dtype, count=size // dtype.itemsize, offset=offset))
+
+        self._strings: list[str | None] = [None] * (len(self.string_offsets) - 1)
+        self._moves: list[Move | None] = [None] * len(self.move_id)
+        self._species: list[Species | None] = [None] * len(self.species_key)
+
+    def string(self, index: int) -> str:
+        string = self._strings[index]
+        if string is None:
+            start, end = self.string_offsets[index], self.string_offsets[index + 1]
+            string = self._strings[index] = self.string_data[start:end].tobytes().decode("utf-8")
+        return string
+
+    def move(self, index: int) -> Move:
+        move = self._moves[index]
+        if move is None:
+            move = self._moves[index] = Move(
+                name=self.string(self.move_name[index]),
+                unique_id=self.string(self.move_id[index]),
+                type=TYPES[self.move_type[index]],
+                power=self.move_power[index],
+                energy=self.move_energy[index],
+                turns=self.move_turns[index],
+                usage_type=self.string(self.move_usage_type[index]),
+                buffs=self._buffs(index),
+                pve=self._pve(index)
+            )
+        return move
+
+    def _buffs(self, index: int) -> dict:
+        stages = self.move_buff_stages[index * len(BUFF_STAGE_CHANGES):(index + 1) * len(BUFF_STAGE_CHANGES)]
+        buffs = {change: stage for change, stage in zip(BUFF_STAGE_CHANGES, stages.tolist()) if stage}
+
+        if buffs:
+            buffs["buffActivationChance"] = float(self.move_buff_chance[index])
+
+        return buffs
+
+    def _pve(self, index: int) -> dict:
+        stats = self.move_pve[index * len(PVE_STATS):(index + 1) * len(PVE_STATS)]
+
+        return {stat: value for stat, value in zip(PVE_STATS, stats.tolist()) if not np.isnan(value)}
+
+    def species(self, index: int) -> Species:
+        species = self._species[index]
+        if species is None:
+            types = [TYPES[type_index] for type_index in (self.species_type_1[index], self.species_type_2[index])
+                     if type_index >= 0]
+
+            species = self._species[index] = Species(
+                name=self.string(self.species_name[index]),
+                species=self.string(self.species_species[index]),
+                types=types,
+                base_attack=_unpack_stat(self.species_base_attack[index]),
+                base_defense=_unpack_stat(self.species_base_defense[index]),
+                base_hp=_unpack_stat(self.species_base_hp[index]),
+                fast_move_pool=self._move_pool(self.fast_move_pool_offsets, self.fast_move_pool, index),
+                charged_move_pool=self._move_pool(self.charged_move_pool_offsets, self.charged_move_pool, index)
+            )
+        return species
+
+    def _move_pool(self, offsets: np.ndarray, pool: np.ndarray, index: int) -> list[Move]:
+        return [self.move(move_index) for move_index in pool[offsets[index]:offsets[index + 1]].tolist()]
+
+    def to_game_data(self) -> GameData:
+        """
+        Returns game data backed by this snapshot.
+
+        Returns
+        -------
+        GameData
+            The game data. Its moves and species are built lazily on first access.
+        """
+        move_indices = {self.string(string_index): index for index, string_index in enumerate(self.move_id.tolist())}
+
+        species_key_indices = {}
+        species_name_indices = {}
+        forms = {}
+        for index, (key, name, species) in enumerate(zip(self.species_key.tolist(), self.species_name.tolist(),
+                                                         self.species_species.tolist())):
+            species_key_indices[self.string(key)] = index
+            species_name_indices[self.string(name)] = index
+            forms.setdefault(self.string(species), []).append(self.string(name))
+
+        return GameData(
+            _LazyMapping(move_indices, self.move),
+            _LazyMapping(species_key_indices, self.species),
+            _LazyMapping(species_name_indices, self.species),
+            {key: tuple(value) for key, value in forms.items()},
+            self.source_digest
+        )
+
+
+class _LazyMapping(Mapping):
+    def __init__(self, indices: dict[str, int], build: Callable[[int], object]):
+        self._indices = indices
+        self._build = build
+
+    def __getitem__(self, key):
+        return self._build(self._indices[key])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._indices)
+
+    def __len__(self) -> int:
+        return len(self._indices)
+
+    def __contains__(self, key) -> bool:
+        return key in self._indices
+
+
+def read_source_digest(snapshot_path: str = snapshot_file) -> bytes | None:
+    """
+    Reads the source digest from a snapshot's header without loading the snapshot.
+
+    Parameters
+    ----------
+    snapshot_path : str
+        The path to the snapshot.
+
+    Returns
+    -------
+    bytes | None
+        The digest of the JSON files the snapshot was compiled from, or None if the
+        snapshot is missing or was written by a different snapshot version.
+    """
+    try:
+        with open(snapshot_path, "rb") as f:
+            header = f.read(HEADER.size)
+    except OSError:
+        return None
+
+    if len(header) < HEADER.size:
+        return None
+
+    magic, version, _, source_digest, _ = HEADER.unpack(header)
+
+    if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+        return None
+
+    return source_digest
+
+
+def load_snapshot(snapshot_path: str = snapshot_file) -> Snapshot:
+    """
+    Memory-maps a snapshot file.
+
+    Parameters
+    ----------
+    snapshot_path : str
+        The path to the snapshot.
+
+    Returns
+    -------
+    Snapshot
+        The snapshot.
+
+    Raises
+    ------
+    ValueError
+        The snapshot is corrupt, or was written by a different snapshot version.
+    """
+    with open(snapshot_path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    return Snapshot(buffer)
+
+
+def load_compiled_game_data(snapshot_path: str = snapshot_file, moves_path: str = moves_file,
+                            pokemon_path: str = pokemon_file) -> GameData:
+    """
+    Loads the game data from its snapshot, recompiling the snapshot first if it is missing or stale.
+
+    Parameters
+    ----------
+    snapshot_path : str
+        The path to the snapshot.
+    moves_path : str
+        The path to the moves JSON file.
+    pokemon_path : str
+        The path to the Pokémon JSON file.
+
+    Returns
+    -------
+    GameData
+        The game data.
+    """
+    if read_source_digest(snapshot_path) != get_source_digest(moves_path, pokemon_path):
+        write_snapshot(snapshot_path, moves_path, pokemon_path)
+
+    try:
+        snapshot = load_snapshot(snapshot_path)
+    except ValueError:
+        # the header is current but the body is damaged, e.g. a truncated copy
+        write_snapshot(snapshot_path, moves_path, pokemon_path)
+        snapshot = load_snapshot(snapshot_path)
+
+    return snapshot.to_game_data()
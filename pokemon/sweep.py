@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+from functools import cache, lru_cache
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from .calculator import calculate_damage_batch, calculate_charged_damage_batch, DAMAGE_ROLL_COUNTS
+from .pokemon import get_cp_multiplier, get_type_index, stat_stages
+
+if TYPE_CHECKING:
+    from pokemon import Pokemon, Species, Move
+
+
+class SweepTable:
+    """
+    Every Pokémon form with base stats paired with every move in its move pool, as columns.
+
+    Attributes
+    ----------
+    species: list[:class:`.Species`]
+        The species of every row.
+    moves: list[:class:`.Move`]
+        The move of every row.
+    base_attack, base_defense, base_hp: np.ndarray
+        The base stats of every row's species.
+    types: np.ndarray
+        The type ordinals of every row's species, with a trailing axis of length 2. -1 means no second type.
+    power: np.ndarray
+        The power of every row's move.
+    move_type: np.ndarray
+        The type ordinal of every row's move.
+    energy: np.ndarray
+        The energy gained or spent by every row's move.
+    turns: np.ndarray
+        The number of turns every row's move takes, at least 1.
+    charged: np.ndarray
+        Whether every row's move is a charged move.
+    species_starts: np.ndarray
+        The first row of every species, every species' rows being next to each other.
+    """
+
+    def __init__(self, species_list: list[Species]):
+        self.species: list[Species] = []
+        self.moves: list[Move] = []
+
+        for species in species_list:
+            if species.base_attack is None or species.base_defense is None or species.base_hp is None:
+                continue
+
+            for move in species.fast_move_pool + species.charged_move_pool:
+                self.species.append(species)
+                self.moves.append(move)
+
+        self.base_attack = np.array([species.base_attack for species in self.species], dtype=np.float64)
+        self.base_defense = np.array([species.base_defense for species in self.species], dtype=np.float64)
+        self.base_hp = np.array([species.base_hp for species in self.species], dtype=np.float64)
+        self.types = np.array([get_type_indices(species.types) for species in self.species], dtype=np.intp)
+        self.power = np.array([move.power for move in self.moves], dtype=np.float64)
+        self.move_type = np.array([get_type_index(move.type) for move in self.moves], dtype=np.intp)
+        self.energy = np.array([move.energy for move in self.moves], dtype=np.float64)
+        self.turns = np.array([max(move.turns, 1) for move in self.moves], dtype=np.float64)
+        self.charged = np.array([move.usage_type == "charge" for move in self.moves], dtype=bool)
+        self.species_starts = np.array([index for index, species in enumerate(self.species)
+                                        if index == 0 or species is not self.species[index - 1]], dtype=np.intp)
+
+    def __len__(self):
+        return len(self.moves)
+
+
+def get_type_indices(types: list) -> tuple[int, int]:
+    """
+    Returns the type ordinals of a Pokémon in the layout the batch damage functions take.
+
+    Parameters
+    ----------
+    types : list[Type]
+        The Pokémon's types.
+
+    Returns
+    -------
+    tuple[int, int]
+        The ordinals of the first and second type. -1 means no second type.
+    """
+    first_type = get_type_index(types[0])
+    second_type = get_type_index(types[1]) if len(types) > 1 else -1
+    return first_type, second_type
+
+
+@cache
+def get_sweep_table() -> SweepTable:
+    """
+    Returns the sweep table of the shared game data, building it on the first call.
+
+    Returns
+    -------
+    SweepTable
+        The sweep table.
+    """
+    from .registry import get_game_data  # resolve circular import
+
+    return SweepTable(list(get_game_data().species))
+
+
+def _calculate_damage_range(attack, defense, power, move_type, attacker_types, defender_types,
+                          charged: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    # the smallest and largest damage of every row: fast moves have one roll, charged moves one per bubble count
+    fast_damage = calculate_damage_batch(attack, defense, power, move_type, attacker_types, defender_types)
+    damage_rolls = calculate_charged_damage_batch(attack, defense, power, move_type, attacker_types, defender_types)
+
+    last_roll = DAMAGE_ROLL_COUNTS[np.broadcast_to(move_type, fast_damage.shape)] - 1
+    charged_damage = np.take_along_axis(damage_rolls, last_roll[..., np.newaxis], axis=-1)[..., 0]
+
+    min_damage = np.where(charged, 1, fast_damage)
+    max_damage = np.where(charged, charged_damage, fast_damage)
+
+    return min_damage, max_damage
+
+
+def _build_rows(species: list, moves: list, min_damage: np.ndarray, max_damage: np.ndarray, hp: np.ndarray,
+                order: np.ndarray) -> tuple[dict, ...]:
+    percentage = np.round(100 * max_damage / hp, 1)
+    hits_to_ko = np.ceil(hp / max_damage).astype(np.int64)
+
+    return tuple(
+        {
+            "species": species[index],
+            "move": moves[index],
+            "min_damage": int(min_damage[index]),
+            "max_damage": int(max_damage[index]),
+            "percentage": float(percentage[index]),
+            "hits_to_ko": int(hits_to_ko[index])
+        }
+        for index in order.tolist()
+    )
+
+
+@lru_cache(maxsize=256)
+def _sweep_attackers(target_types: tuple[int, int], target_defense: float, target_hp: int, level: float,
+                     attack_iv: int, attack_stages: int, shadow: bool) -> tuple[dict, ...]:
+    table = get_sweep_table()
+
+    attack = (table.base_attack + attack_iv) * get_cp_multiplier(level) * stat_stages.get(attack_stages, 1.0)
+
+    min_damage, max_damage = _calculate_damage_range(
+        attack * (6 / 5 if shadow else 1.0), target_defense, table.power, table.move_type, table.types,
+        np.array(target_types), table.charged
+    )
+
+    # strongest first, ties keep game data order
+    order = np.argsort(-max_damage, kind="stable")
+
+    return _build_rows(table.species, table.moves, min_damage, max_damage, np.full(len(table), target_hp), order)
+
+
+def find_attackers(target: Pokemon, damage_threshold: int | None = None, level: float = 40.0, attack_iv: int = 15,
+                   attack_stages: int = 0, shadow: bool = False) -> list[dict]:
+    """
+    Ranks every Pokémon form and every move in its move pool by the damage it deals to a target.
+
+    Results are cached by the target's types, defense and HP, so repeated sweeps against the same target are instant.
+
+    Parameters
+    ----------
+    target : Pokemon
+        The defending Pokémon.
+    damage_threshold : int | None
+        Only return moves that deal at least this much damage. Pass ``target.get_true_hp()`` to find
+        every move that knocks the target out in one hit.
+    level : float
+        The attackers' level.
+    attack_iv : int
+        The attackers' attack IV.
+    attack_stages : int
+        The attackers' attack stat stages.
+    shadow : bool
+        Whether the attackers are Shadow Pokémon.
+
+    Returns
+    -------
+    list[dict]
+        One dictionary per form and move, strongest first, with the keys ``species``, ``move``,
+        ``min_damage``, ``max_damage``, ``percentage`` (of the target's HP) and ``hits_to_ko``.
+        Charged moves are ranked by their damage after swiping every bubble, and shielded
+        charged moves deal 1 ``min_damage``.
+    """
+    rows = _sweep_attackers(
+        get_type_indices(target.species.types), target.get_true_defense(include_shadow=True), target.get_true_hp(),
+        level, attack_iv, attack_stages, shadow
+    )
+
+    # the rows are cached, so callers get copies they can change
+    return [dict(row) for row in rows if damage_threshold is None or row["max_damage"] >= damage_threshold]
+
+
+@lru_cache(maxsize=256)
+def _sweep_defenders(attacker_types: tuple[int, int], attacker_attack: float, moves: tuple[Move, ...],
+                     level: float, defense_iv: int, hp_iv: int, defense_stages: int,
+                     shadow: bool) -> tuple[dict, ...]:
+    from .registry import get_game_data  # resolve circular import
+
+    # one row per defending form, one column per attacking move
+    defenders = [
+        species for species in get_game_data().species
+        if species.base_attack is not None and species.base_defense is not None and species.base_hp is not None
+    ]
+    base_defense = np.array([species.base_defense for species in defenders], dtype=np.float64)
+    base_hp = np.array([species.base_hp for species in defenders], dtype=np.float64)
+    defender_types = np.array([get_type_indices(species.types) for species in defenders], dtype=np.intp)
+
+    cp_multiplier = get_cp_multiplier(level)
+    defense = (base_defense + defense_iv) * cp_multiplier * stat_stages.get(defense_stages, 1.0)
+    hp = np.maximum(((base_hp + hp_iv) * cp_multiplier).astype(np.int64), 10)
+
+    power = np.array([move.power for move in moves], dtype=np.float64)
+    move_type = np.array([get_type_index(move.type) for move in moves], dtype=np.intp)
+    charged = np.array([move.usage_type == "charge" for move in moves], dtype=bool)
+
+    min_damage, max_damage = _calculate_damage_range(
+        attacker_attack, (defense * (5 / 6 if shadow else 1.0))[:, np.newaxis], power, move_type,
+        np.array(attacker_types), defender_types[:, np.newaxis, :], charged
+    )
+
+    species_column = [species for species in defenders for _ in moves]
+    moves_column = list(moves) * len(defenders)
+    hp = np.repeat(hp, len(moves))
+    min_damage, max_damage = min_damage.ravel(), max_damage.ravel()
+
+    # bulkiest first, measured by the share of HP lost, ties keep game data order
+    order = np.argsort(max_damage / hp, kind="stable")
+
+    return _build_rows(species_column, moves_column, min_damage, max_damage, hp, order)
+
+
+def find_walls(attacker: Pokemon, moves: list[Move] | None = None, damage_threshold: int | None = None,
+               level: float = 40.0, defense_iv: int = 15, hp_iv: int = 15, defense_stages: int = 0,
+               shadow: bool = False) -> list[dict]:
+    """
+    Ranks every Pokémon form by how little damage it takes from an attacker's moves.
+
+    Results are cached by the attacker's types, attack and moves, so repeated sweeps with the same
+    attacker are instant.
+
+    Parameters
+    ----------
+    attacker : Pokemon
+        The attacking Pokémon.
+    moves : list[Move] | None
+        The attacker's moves. If None, every move in the attacker's move pool is used.
+    damage_threshold : int | None
+        Only return moves that deal less than this much damage.
+    level : float
+        The defenders' level.
+    defense_iv : int
+        The defenders' defense IV.
+    hp_iv : int
+        The defenders' HP IV.
+    defense_stages : int
+        The defenders' defense stat stages.
+    shadow : bool
+        Whether the defenders are Shadow Pokémon.
+
+    Returns
+    -------
+    list[dict]
+        One dictionary per form and move, least damage taken (as a share of the form's HP) first, with the
+        keys ``species``, ``move``, ``min_damage``, ``max_damage``, ``percentage`` and ``hits_to_ko``.
+    """
+    if moves is None:
+        moves = attacker.species.fast_move_pool + attacker.species.charged_move_pool
+
+    rows = _sweep_defenders(
+        get_type_indices(attacker.species.types), attacker.get_true_attack(include_shadow=True), tuple(moves),
+        level, defense_iv, hp_iv, defense_stages, shadow
+    )
+
+    # the rows are cached, so callers get copies they can change
+    return [dict(row) for row in rows if damage_threshold is None or row["max_damage"] < damage_threshold]
@@ -0,0 +1,338 @@
+from __future__ import annotations
+
+import sys
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from .battle import Battle, MAX_ENERGY, MAX_SHIELDS, FAST_MOVE, CHARGED_MOVE, LOG_DTYPE
+
+if TYPE_CHECKING:
+    from pokemon import Pokemon, Move
+
+DEFAULT_CACHE_SIZE = 1 << 20
+
+# a state packs both sides' HP, energy, shields and cooldown into one int, cooldown in the lowest bits
+_HP_BITS = 16
+_ENERGY_BITS = 7
+_SHIELD_BITS = 2
+_COOLDOWN_BITS = 3
+
+
+def _encode_state(hp1: int, hp2: int, energy1: int, energy2: int, shields1: int, shields2: int, cooldown1: int,
+                  cooldown2: int) -> int:
+    state = hp1
+    state = state << _HP_BITS | hp2
+    state = state << _ENERGY_BITS | energy1
+    state = state << _ENERGY_BITS | energy2
+    state = state << _SHIELD_BITS | shields1
+    state = state << _SHIELD_BITS | shields2
+    state = state << _COOLDOWN_BITS | cooldown1
+    state = state << _COOLDOWN_BITS | cooldown2
+    return state
+
+
+def _decode_state(state: int) -> tuple[int, int, int, int, int, int, int, int]:
+    cooldown2 = state & (1 << _COOLDOWN_BITS) - 1
+    state >>= _COOLDOWN_BITS
+    cooldown1 = state & (1 << _COOLDOWN_BITS) - 1
+    state >>= _COOLDOWN_BITS
+    shields2 = state & (1 << _SHIELD_BITS) - 1
+    state >>= _SHIELD_BITS
+    shields1 = state & (1 << _SHIELD_BITS) - 1
+    state >>= _SHIELD_BITS
+    energy2 = state & (1 << _ENERGY_BITS) - 1
+    state >>= _ENERGY_BITS
+    energy1 = state & (1 << _ENERGY_BITS) - 1
+    state >>= _ENERGY_BITS
+    hp2 = state & (1 << _HP_BITS) - 1
+    hp1 = state >> _HP_BITS
+    return hp1, hp2, energy1, energy2, shields1, shields2, cooldown1, cooldown2
+
+
+class TimingSolver:
+    """
+    Finds when the first Pokémon of a :class:`.Battle` should throw its charged moves, and which ones.
+
+    Every turn the first Pokémon is free to act, it either uses its fast move or throws a charged move it can
+    afford, and whenever a charged move is thrown at it, it either shields or takes the hit. The second
+    Pokémon throws its charged moves like in :meth:`.Battle.run`, but shields in the way that is worst for
+    the first Pokémon. The solver picks the choices that maximize the first Pokémon's battle rating, see
+    :meth:`.Battle.summarize`, against that opponent. Battles are played out to a faint, without a timeout.
+
+    The value of every state reached, both sides' HP, energy, shields and turns until they are free to act,
+    is memoized in an LRU table keyed by the state packed into one int. Charged moves that cost at least as
+    much as another of the first Pokémon's charged moves without dealing more damage are never thrown, and
+    a charged move that faints an opponent without shields is always thrown at once.
+
+    Attributes
+    ----------
+    battle: :class:`.Battle`
+        The battle.
+    cache_size: int | None
+        The most states the table holds before it evicts the least recently used one. None for no limit.
+
+    Raises
+    ------
+    ValueError
+        The first Pokémon's fast move takes longer than the solver's state can hold.
+    """
+
+    def __init__(self, battle: Battle, cache_size: int | None = DEFAULT_CACHE_SIZE):
+        if max(battle.fast_turns) >= 1 << _COOLDOWN_BITS:
+            raise ValueError(f"Fast moves may take at most {(1 << _COOLDOWN_BITS) - 1} turns")
+
+        self.battle = battle
+        self.cache_size = cache_size
+
+        cost, damage = battle.charged_cost[0], battle.charged_damage[0]
+
+        def is_dominated(move: int) -> bool:
+            return any(
+                cost[other] <= cost[move] and damage[other] >= damage[move]
+                and (cost[other] < cost[move] or damage[other] > damage[move] or other < move)
+                for other in range(1, len(cost)) if other != move
+            )
+
+        # cheapest first
+        self._charged_moves = sorted((move for move in range(1, len(cost)) if not is_dominated(move)),
+                                     key=lambda move: cost[move])
+
+        self._value = lru_cache(maxsize=cache_size)(self._search)
+
+    def _rate(self, hp1: int, hp2: int) -> float:
+        start_hp1, start_hp2 = self.battle.hp
+        return 500 * (start_hp2 - max(hp2, 0)) / start_hp2 + 500 * max(hp1, 0) / start_hp1
+
+    def _get_options(self, hp2: int, energy1: int, shields2: int, cooldown1: int) -> list[int | None]:
+        # None while the fast move is still going, 0 for the fast move, otherwise the charged move
+        if cooldown1:
+            return [None]
+
+        cost, damage = self.battle.charged_cost[0], self.battle.charged_damage[0]
+        affordable = [move for move in self._charged_moves if cost[move] <= energy1]
+
+        if not shields2:
+            for move in affordable:
+                if damage[move] >= hp2:
+                    return [move]
+
+        return [0] + affordable
+
+    def _search(self, state: int) -> float:
+        hp1, hp2, energy1, energy2, shields1, shields2, cooldown1, cooldown2 = _decode_state(state)
+
+        return max(
+            self._step(hp1, hp2, energy1, energy2, shields1, shields2, cooldown1, cooldown2, option)
+            for option in self._get_options(hp2, energy1, shields2, cooldown1)
+        )
+
+    def _step(self, hp1: int, hp2: int, energy1: int, energy2: int, shields1: int, shields2: int, cooldown1: int,
+              cooldown2: int, option: int | None, trace: list | None = None, turn: int = 0) -> float:
+        # plays out one turn like Battle.run, with every turn counted from this one
+        battle = self.battle
+        fast_damage1, fast_damage2 = battle.fast_damage
+        fast_energy1, fast_energy2 = battle.fast_energy
+        fast_turns1, fast_turns2 = battle.fast_turns
+
+        throw1 = throw2 = 0
+        ready1, ready2 = cooldown1, cooldown2
+        land1 = cooldown1 - 1 if cooldown1 else -1
+        land2 = cooldown2 - 1 if cooldown2 else -1
+
+        if not cooldown1:
+            if option:
+                throw1 = option
+                ready1 = 1
+            else:
+                land1 = fast_turns1 - 1
+                ready1 = fast_turns1
+
+        if not cooldown2:
+            throw2 = battle.choices[1][shields1 > 0][energy2]
+            if throw2:
+                ready2 = 1
+            else:
+                land2 = fast_turns2 - 1
+                ready2 = fast_turns2
+
+        if not land1:
+            land1 = -1
+            hp2 -= fast_damage1
+            energy1 = min(energy1 + fast_energy1, MAX_ENERGY)
+
+            if trace is not None:
+                trace.append((turn, 0, FAST_MOVE, 0, fast_damage1, False, max(hp1, 0), max(hp2, 0), energy1,
+                              energy2))
+
+        if not land2:
+            land2 = -1
+            hp1 -= fast_damage2
+            energy2 = min(energy2 + fast_energy2, MAX_ENERGY)
+
+            if trace is not None:
+                trace.append((turn, 1, FAST_MOVE, 0, fast_damage2, False, max(hp1, 0), max(hp2, 0), energy1,
+                              energy2))
+
+        if hp1 <= 0 or hp2 <= 0:
+            return self._rate(hp1, hp2)
+
+        # the next turn where something happens
+        delta = min(ready1 if land1 < 0 else land1, ready2 if land2 < 0 else land2)
+
+        return self._resolve(hp1, hp2, energy1, energy2, shields1, shields2, ready1 - delta, ready2 - delta, throw1,
+                             throw2, trace, turn, delta)
+
+    def _resolve(self, hp1: int, hp2: int, energy1: int, energy2: int, shields1: int, shields2: int, cooldown1: int,
+                 cooldown2: int, throw1: int, throw2: int, trace: list | None, turn: int, delta: int) -> float:
+        # charged moves go one at a time in priority order, and the defender decides whether to shield each one
+        if throw1 and throw2:
+            side = self.battle.priority
+        elif throw1 or throw2:
+            side = 0 if throw1 else 1
+        else:
+            if trace is not None:
+                return self._follow(
+                    _encode_state(hp1, hp2, energy1, energy2, shields1, shields2, cooldown1, cooldown2), trace,
+                    turn + delta
+                )
+            return self._value(_encode_state(hp1, hp2, energy1, energy2, shields1, shields2, cooldown1, cooldown2))
+
+        move = throw1 if side == 0 else throw2
+        damage = self.battle.charged_damage[side][move]
+        cost = self.battle.charged_cost[side][move]
+
+        def resolve(shielded: bool, branch_trace: list | None) -> float:
+            hit = 1 if shielded else damage
+
+            if side == 0:
+                arguments = (hp1, hp2 - hit, energy1 - cost, energy2, shields1, shields2 - shielded)
+            else:
+                arguments = (hp1 - hit, hp2, energy1, energy2 - cost, shields1 - shielded, shields2)
+
+            if branch_trace is not None:
+                next_hp1, next_hp2, next_energy1, next_energy2 = arguments[:4]
+                branch_trace.append((turn, side, CHARGED_MOVE, move, hit, shielded, max(next_hp1, 0),
+                                     max(next_hp2, 0), next_energy1, next_energy2))
+
+            if arguments[0] <= 0 or arguments[1] <= 0:
+                return self._rate(arguments[0], arguments[1])
+
+            return self._resolve(*arguments, cooldown1, cooldown2, 0 if side == 0 else throw1,
+                                 throw2 if side == 0 else 0, branch_trace, turn, delta)
+
+        shield_options = (True, False) if (shields2 if side == 0 else shields1) else (False,)
+        values = [resolve(shielded, None) for shielded in shield_options]
+
+        # the second Pokémon shields to hurt the first one's rating, the first Pokémon to help it
+        best = min(values) if side == 0 else max(values)
+
+        if trace is not None:
+            return resolve(shield_options[values.index(best)], trace)
+
+        return best
+
+    def _follow(self, state: int, trace: list, turn: int) -> float:
+        # replays the best choices from a state, recording every move
+        hp1, hp2, energy1, energy2, shields1, shields2, cooldown1, cooldown2 = _decode_state(state)
+        best = self._value(state)
+
+        for option in self._get_options(hp2, energy1, shields2, cooldown1):
+            if self._step(hp1, hp2, energy1, energy2, shields1, shields2, cooldown1, cooldown2, option) == best:
+                return self._step(hp1, hp2, energy1, energy2, shields1, shields2, cooldown1, cooldown2, option,
+                                  trace, turn)
+
+    def solve(self, shields: tuple[int, int] = (MAX_SHIELDS, MAX_SHIELDS)) -> dict:
+        """
+        Finds the best play for the first Pokémon from full HP and no energy.
+
+        Parameters
+        ----------
+        shields : tuple[int, int]
+            Both Pokémon's shields, from 0 to 2.
+
+        Returns
+        -------
+        dict
+            The keys of :meth:`.Battle.run`, with the ``log`` of the best play, plus ``rating`` (the first
+            Pokémon's battle rating) and ``cache``, a dictionary with the ``hits``, ``misses`` (states
+            searched) and ``size`` of the state table so far.
+
+        Raises
+        ------
+        ValueError
+            Shields are not between 0 and 2.
+        """
+        if not all(0 <= shield <= MAX_SHIELDS for shield in shields):
+            raise ValueError(f"Shields must be between 0 and {MAX_SHIELDS}")
+
+        hp1, hp2 = self.battle.hp
+        root = _encode_state(hp1, hp2, 0, 0, shields[0], shields[1], 0, 0)
+
+        # every move is a level of recursion, and a battle of 1 damage fast moves has one move per HP
+        recursion_limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(max(recursion_limit, 8 * (hp1 + hp2) + 1000))
+        try:
+            trace = []
+            rating = self._follow(root, trace, 0)
+        finally:
+            sys.setrecursionlimit(recursion_limit)
+
+        log = np.array(trace, dtype=LOG_DTYPE)
+        last = log[-1]
+
+        if rating > 500:
+            winner = 0
+        elif rating < 500:
+            winner = 1
+        else:
+            winner = None
+
+        cache_info = self._value.cache_info()
+
+        return {
+            "winner": winner,
+            "hp": (int(last["hp_1"]), int(last["hp_2"])),
+            "energy": (int(last["energy_1"]), int(last["energy_2"])),
+            "shields": (shields[0] - int(np.count_nonzero(log["shielded"] & (log["side"] == 1))),
+                        shields[1] - int(np.count_nonzero(log["shielded"] & (log["side"] == 0)))),
+            "turns": int(last["turn"]) + 1,
+            "log": log,
+            "rating": rating,
+            "cache": {"hits": cache_info.hits, "misses": cache_info.misses, "size": cache_info.currsize}
+        }
+
+
+def solve_battle(pokemon1: Pokemon, moveset1: list[Move], pokemon2: Pokemon, moveset2: list[Move],
+                 shields: tuple[int, int] = (MAX_SHIELDS, MAX_SHIELDS),
+                 cache_size: int | None = DEFAULT_CACHE_SIZE) -> dict:
+    """
+    Finds when the first of two Pokémon should throw its charged moves, and which ones, see :class:`TimingSolver`.
+
+    Parameters
+    ----------
+    pokemon1 : Pokemon
+        The first Pokémon, whose play is optimized.
+    moveset1 : list[Move]
+        The first Pokémon's fast move followed by one or two charged moves.
+    pokemon2 : Pokemon
+        The second Pokémon.
+    moveset2 : list[Move]
+        The second Pokémon's fast move followed by one or two charged moves.
+    shields : tuple[int, int]
+        Both Pokémon's shields, from 0 to 2.
+    cache_size : int | None
+        The most states the solver remembers. None for no limit.
+
+    Returns
+    -------
+    dict
+        The result of :meth:`TimingSolver.solve`.
+
+    Raises
+    ------
+    ValueError
+        A moveset is not one fast move followed by one or two charged moves.
+    """
+    return TimingSolver(Battle(pokemon1, moveset1, pokemon2, moveset2), cache_size).solve(shields)